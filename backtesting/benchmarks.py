@@ -0,0 +1,204 @@
+import argparse
+import contextlib
+import io
+import json
+import platform
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from indicators import IndicatorCache
+from main_claude import Backtester
+from simulator import simulate_portfolio
+from sweep import sma_crossover_sweep
+from universe import backtest_prices
+
+
+def random_walk_ohlcv(n_bars, seed=0, start_price=100.0, volatility=0.01):
+    """
+    Synthetic OHLCV bars from a geometric random walk (minute timestamps, so
+    even 10M bars stay inside the pandas date range)
+    """
+    rng = np.random.default_rng(seed)
+    close = start_price * np.exp(np.cumsum(rng.normal(0.0, volatility, n_bars)))
+    open_ = np.concatenate([[start_price], close[:-1]])
+    spread = np.abs(rng.normal(0.0, volatility / 2, n_bars)) * close
+    return pd.DataFrame({
+        'Open': open_,
+        'High': np.maximum(open_, close) + spread,
+        'Low': np.minimum(open_, close) - spread,
+        'Close': close,
+        'Volume': rng.integers(1_000, 1_000_000, n_bars).astype(np.float64),
+    }, index=pd.date_range('2000-01-03', periods=n_bars, freq='min', name='Date'))
+
+
+def random_walk_universe(n_symbols, n_bars, seed=0, volatility=0.01):
+    """Closing prices for n_symbols independent random walks, shape (n_symbols, n_bars)"""
+    rng = np.random.default_rng(seed)
+    steps = rng.normal(0.0, volatility, (n_symbols, n_bars))
+    return 100.0 * np.exp(np.cumsum(steps, axis=1))
+
+
+def _measure(stage, repeat, items):
+    """
+    Time a stage (best of `repeat` runs) and measure its peak traced memory
+
+    Parameters:
+    stage: Callable running the stage once; prints are silenced
+    repeat: Timed repetitions
+    items: Bars processed per run, used for the throughput figure
+    """
+    wall_times = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            stage()
+            wall_times.append(time.perf_counter() - start)
+
+    # Separate run for memory, tracemalloc slows allocations down
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        stage()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    wall = min(wall_times)
+    return {
+        'wall_time': wall,
+        'peak_memory_mb': peak / 2 ** 20,
+        'bars_per_second': items / wall if wall > 0 else float('inf'),
+    }
+
+
+def run_benchmarks(bar_counts=(1_000, 100_000), symbol_counts=(1, 50), repeat=3,
+                   short_window=20, long_window=50, processes=1):
+    """
+    Benchmark the backtesting hot paths on synthetic data (no network)
+
+    Parameters:
+    bar_counts: Series lengths for the single-symbol stages
+    symbol_counts: Universe sizes for the multi-symbol stage (at the smallest bar count)
+    repeat: Timed repetitions per stage, the best run is reported
+    processes: Worker processes for the universe stage (1 = in-process)
+
+    Returns a dict of benchmark name -> {wall_time, peak_memory_mb, bars_per_second}
+    """
+    results = {}
+    for n_bars in bar_counts:
+        data = random_walk_ohlcv(n_bars)
+        bt = Backtester('SYNTH', None, None, indicators=IndicatorCache())
+
+        def strategy():
+            # Start cold every run so indicator memoization does not hide the real cost
+            bt.indicators.clear()
+            bt.data = data.copy()
+            bt.moving_average_strategy(short_window, long_window)
+
+        def returns():
+            bt.calculate_returns()
+
+        def metrics():
+            bt.get_performance_metrics()
+
+        # Warm-up run (also triggers any JIT compilation) to get the inputs of the later stages
+        with contextlib.redirect_stdout(io.StringIO()):
+            strategy()
+            returns()
+            metrics()
+        close = data['Close'].to_numpy()
+        position = bt.data['Position'].fillna(0).to_numpy()
+
+        stages = {
+            'moving_average_strategy': strategy,
+            'calculate_returns': returns,
+            'get_performance_metrics': metrics,
+            'simulate_portfolio': lambda: simulate_portfolio(close, position),
+            'sma_crossover_sweep': lambda: sma_crossover_sweep(close, range(10, 60, 10), range(50, 250, 50)),
+        }
+        for name, stage in stages.items():
+            results[f"{name}[bars={n_bars}]"] = _measure(stage, repeat, n_bars)
+
+    n_bars = min(bar_counts)
+    for n_symbols in symbol_counts:
+        prices = random_walk_universe(n_symbols, n_bars)
+        symbols = [f"SYM{i}" for i in range(n_symbols)]
+        index = pd.date_range('2000-01-03', periods=n_bars, freq='min')
+        results[f"universe[symbols={n_symbols},bars={n_bars}]"] = _measure(
+            lambda: backtest_prices(symbols, index, prices, short_window, long_window, processes=processes),
+            repeat, n_symbols * n_bars,
+        )
+    return results
+
+
+def compare(results, baseline, tolerance=0.25):
+    """
+    Flag benchmarks that got slower than the baseline by more than `tolerance`
+
+    Returns a list of (name, baseline_time, current_time) regressions
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get('results', {}).get(name)
+        if previous and current['wall_time'] > previous['wall_time'] * (1 + tolerance):
+            regressions.append((name, previous['wall_time'], current['wall_time']))
+    return regressions
+
+
+def print_table(results, baseline=None):
+    print(f"{'Benchmark':<55} {'Wall (ms)':>10} {'Peak (MB)':>10} {'Bars/s':>14} {'vs base':>8}")
+    for name, r in results.items():
+        change = ''
+        previous = (baseline or {}).get('results', {}).get(name)
+        if previous:
+            change = f"{r['wall_time'] / previous['wall_time'] - 1:+.0%}"
+        print(f"{name:<55} {r['wall_time'] * 1000:>10.2f} {r['peak_memory_mb']:>10.2f} "
+              f"{r['bars_per_second']:>14,.0f} {change:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the backtesting hot paths on synthetic data')
+    parser.add_argument('--bars', type=int, nargs='+', default=[1_000, 100_000],
+                        help='Series lengths to benchmark (1k to 10M)')
+    parser.add_argument('--symbols', type=int, nargs='+', default=[1, 50],
+                        help='Universe sizes to benchmark (1 to 2000)')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--processes', type=int, default=1, help='Worker processes for the universe stage')
+    parser.add_argument('--save', help='Write results to this JSON baseline file')
+    parser.add_argument('--compare', help='Compare against this JSON baseline file')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed slowdown vs baseline before flagging (0.25 = 25%%)')
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.bars, args.symbols, args.repeat, processes=args.processes)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_table(results, baseline)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({
+                'created': datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'pandas': pd.__version__,
+                'results': results,
+            }, f, indent=2)
+        print(f"\nBaseline saved to {args.save}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        for name, before, after in regressions:
+            print(f"REGRESSION {name}: {before * 1000:.2f} ms -> {after * 1000:.2f} ms")
+        if regressions:
+            raise SystemExit(1)
+        print("\nNo regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CACHE_DIR = Path(os.environ.get('PY_LAB_CACHE_DIR', Path.home() / '.cache' / 'py-lab')) / 'ohlcv'
+COLUMNS = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+
+class YahooProvider:
+    """Fetch OHLCV history from Yahoo Finance"""
+
+    def history(self, symbol, start, end, interval='1d'):
+        import yfinance as yf
+        return yf.Ticker(symbol).history(start=start, end=end, interval=interval)
+
+
+class CSVProvider:
+    """
+    Serve OHLCV history from local CSV files (<directory>/<symbol>.csv)
+
+    Useful as an offline fixture source: the first column must be the date.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    def history(self, symbol, start, end, interval='1d'):
+        data = pd.read_csv(self.directory / f"{symbol}.csv", index_col=0)
+        data.index = pd.to_datetime(data.index)
+        start, end = _bounds(start, end, data.index.tz)
+        return data[(data.index >= start) & (data.index < end)]
+
+
+class OHLCVCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, provider=None):
+        """
+        Persistent columnar OHLCV cache backed by memory-mapped NumPy files
+
+        Each (symbol, interval) is stored as one .npy file per column plus a
+        meta.json recording the date range already fetched, so only the
+        missing part of a requested range is downloaded and appended.
+
+        Parameters:
+        cache_dir: Root directory for cached data
+        provider: Object with history(symbol, start, end, interval) returning a
+                  DataFrame (defaults to YahooProvider)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.provider = provider or YahooProvider()
+
+    def _path(self, symbol, interval):
+        return self.cache_dir / interval / symbol.replace('/', '_')
+
+    def _read_meta(self, path):
+        try:
+            return json.loads((path / 'meta.json').read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _load(self, path, mmap_mode='r'):
+        timestamps = np.load(path / 'timestamps.npy', mmap_mode=mmap_mode)
+        columns = {col: np.load(path / f"{col}.npy", mmap_mode=mmap_mode)
+                   for col in COLUMNS if (path / f"{col}.npy").exists()}
+        return timestamps, columns
+
+    def _save(self, path, frame, meta):
+        path.mkdir(parents=True, exist_ok=True)
+        arrays = {'timestamps': frame.index.tz_convert('UTC').as_unit('ns').asi8}
+        arrays.update({col: frame[col].to_numpy(dtype=np.float64) for col in COLUMNS if col in frame})
+
+        # Write to temporary files first so a crash never leaves a half-written cache
+        for name, values in arrays.items():
+            with open(path / f"{name}.npy.tmp", 'wb') as f:
+                np.save(f, values)
+        for name in arrays:
+            os.replace(path / f"{name}.npy.tmp", path / f"{name}.npy")
+        (path / 'meta.json').write_text(json.dumps(meta))
+
+    def _fetch(self, symbol, start, end, interval):
+        frame = self.provider.history(symbol, start=start.strftime('%Y-%m-%d'),
+                                      end=end.strftime('%Y-%m-%d'), interval=interval)
+        if frame is None or frame.empty:
+            return None
+        frame = frame[[col for col in COLUMNS if col in frame.columns]]
+        if frame.index.tz is None:
+            frame = frame.tz_localize('UTC')
+        return frame
+
+    def get(self, symbol, start, end=None, interval='1d'):
+        """
+        Return OHLCV data for [start, end), fetching only what is not cached yet
+
+        Parameters:
+        symbol: Ticker symbol (e.g. 'TCS.NS')
+        start: Start date (YYYY-MM-DD)
+        end: End date, exclusive (YYYY-MM-DD, defaults to tomorrow)
+        interval: Bar interval passed to the provider (e.g. '1d')
+        """
+        today = pd.Timestamp.now().normalize()
+        start = pd.Timestamp(start).normalize()
+        end = pd.Timestamp(end).normalize() if end is not None else today + pd.Timedelta(days=1)
+
+        path = self._path(symbol, interval)
+        meta = self._read_meta(path)
+
+        if meta is None:
+            missing = [(start, end)]
+            covered_start, covered_end = start, end
+        else:
+            covered_start, covered_end = pd.Timestamp(meta['start']), pd.Timestamp(meta['end'])
+            missing = []
+            if start < covered_start:
+                missing.append((start, covered_start))
+            if end > covered_end:
+                missing.append((covered_end, end))
+
+        if missing:
+            frames = [frame for frame in (self._fetch(symbol, s, e, interval) for s, e in missing)
+                      if frame is not None]
+            fetched_rows = sum(len(frame) for frame in frames)
+            if meta is not None:
+                frames.insert(0, self._cached_frame(path, meta['tz']))
+            if frames:
+                merged = pd.concat(frames)
+                merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+                tz = str(frames[-1].index.tz)
+                # Today's bar may still be forming, so never mark it as covered
+                new_meta = {
+                    'start': str(min(start, covered_start).date()),
+                    'end': str(min(max(end, covered_end), today).date()),
+                    'tz': tz,
+                }
+                self._save(path, merged.tz_convert(tz), new_meta)
+                meta = new_meta
+            print(f"Cache updated for {symbol} ({interval}): {fetched_rows} new rows")
+
+        if meta is None:
+            return pd.DataFrame(columns=list(COLUMNS), index=pd.DatetimeIndex([], tz='UTC'))
+        return self._cached_frame(path, meta['tz'], start, end)
+
+    def _cached_frame(self, path, tz, start=None, end=None):
+        timestamps, columns = self._load(path)
+        lo, hi = 0, len(timestamps)
+        if start is not None:
+            start, end = _bounds(start, end, tz)
+            lo = np.searchsorted(timestamps, start.tz_convert('UTC').value, side='left')
+            hi = np.searchsorted(timestamps, end.tz_convert('UTC').value, side='left')
+
+        index = pd.DatetimeIndex(np.asarray(timestamps[lo:hi]).view('datetime64[ns]'), tz='UTC')
+        return pd.DataFrame({col: np.array(values[lo:hi]) for col, values in columns.items()},
+                            index=index.tz_convert(tz).rename('Date'))
+
+
+def _bounds(start, end, tz):
+    """Localize naive start/end dates to the timezone of the data"""
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    if tz is not None:
+        start = start.tz_localize(tz) if start.tz is None else start.tz_convert(tz)
+        end = end.tz_localize(tz) if end.tz is None else end.tz_convert(tz)
+    return start, end
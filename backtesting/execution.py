@@ -0,0 +1,335 @@
+import numpy as np
+import pandas as pd
+
+BUY = 1
+SELL = -1
+
+
+class IndianEquityCharges:
+    def __init__(self, segment='delivery', brokerage_rate=None, brokerage_cap=20.0,
+                 exchange_rate=0.0000297, sebi_rate=0.000001, gst_rate=0.18, dp_charge=15.93):
+        """
+        Statutory charges and brokerage for NSE cash equity, discount-broker style
+
+        Parameters:
+        segment: 'delivery' (STT 0.1% both sides, stamp 0.015% on buys, DP charge
+                 on sells) or 'intraday' (STT 0.025% on sells, stamp 0.003% on buys)
+        brokerage_rate: Brokerage as a fraction of turnover (defaults to 0 for
+                        delivery, 0.03% for intraday), capped at brokerage_cap per order
+        exchange_rate: NSE transaction charge as a fraction of turnover
+        sebi_rate: SEBI turnover fee (Rs 10 per crore)
+        gst_rate: GST on brokerage, exchange and SEBI charges
+        dp_charge: Depository charge per delivery sell order
+        """
+        if segment not in ('delivery', 'intraday'):
+            raise ValueError("segment must be 'delivery' or 'intraday'")
+        self.segment = segment
+        self.brokerage_rate = brokerage_rate if brokerage_rate is not None else (
+            0.0 if segment == 'delivery' else 0.0003)
+        self.brokerage_cap = brokerage_cap
+        self.exchange_rate = exchange_rate
+        self.sebi_rate = sebi_rate
+        self.gst_rate = gst_rate
+        self.dp_charge = dp_charge if segment == 'delivery' else 0.0
+        if segment == 'delivery':
+            self.stt_buy, self.stt_sell, self.stamp_rate = 0.001, 0.001, 0.00015
+        else:
+            self.stt_buy, self.stt_sell, self.stamp_rate = 0.0, 0.00025, 0.00003
+
+    def compute(self, side, turnover):
+        """Total charges for one order of the given traded value"""
+        brokerage = min(turnover * self.brokerage_rate, self.brokerage_cap)
+        exchange = turnover * self.exchange_rate
+        sebi = turnover * self.sebi_rate
+        gst = (brokerage + exchange + sebi) * self.gst_rate
+        if side == BUY:
+            return brokerage + exchange + sebi + gst + turnover * (self.stt_buy + self.stamp_rate)
+        return brokerage + exchange + sebi + gst + turnover * self.stt_sell + self.dp_charge
+
+    def max_buy_turnover(self, cash):
+        """Largest buy turnover that, with its charges, costs at most `cash` (closed form)"""
+        linear = (self.exchange_rate + self.sebi_rate) * (1 + self.gst_rate) + self.stt_buy + self.stamp_rate
+        turnover = cash / (1 + linear + self.brokerage_rate * (1 + self.gst_rate))
+        if turnover * self.brokerage_rate > self.brokerage_cap:
+            # An order this size pays the capped (fixed) brokerage instead
+            turnover = (cash - self.brokerage_cap * (1 + self.gst_rate)) / (1 + linear)
+        return max(turnover, 0.0)
+
+
+class NoCharges:
+    """Frictionless fills"""
+
+    def compute(self, side, turnover):
+        return 0.0
+
+    def max_buy_turnover(self, cash):
+        return max(cash, 0.0)
+
+
+class FixedSlippage:
+    def __init__(self, bps=5.0):
+        """
+        Constant adverse slippage
+
+        Parameters:
+        bps: Slippage in basis points of the fill price
+        """
+        self.bps = bps
+
+    def fraction(self, open_, high, low, close):
+        return np.full(len(open_), self.bps / 10000)
+
+
+class RangeSlippage:
+    def __init__(self, multiplier=0.1):
+        """
+        Slippage proportional to the bar's high-low range (wider bars, worse fills)
+
+        Parameters:
+        multiplier: Fraction of the bar range paid as slippage
+        """
+        self.multiplier = multiplier
+
+    def fraction(self, open_, high, low, close):
+        return self.multiplier * (high - low) / close
+
+
+class PositionSizer:
+    def __init__(self, fraction=1.0, lot_size=None):
+        """
+        Decide how many shares a buy order takes
+
+        Parameters:
+        fraction: Fraction of current equity committed to each new position
+        lot_size: Trade in multiples of this many shares (None = fractional shares)
+        """
+        self.fraction = fraction
+        self.lot_size = lot_size
+
+    def quantity(self, cash, equity, price, charges):
+        """
+        Shares to buy so that turnover plus buy-side charges fit in the budget
+
+        Parameters:
+        charges: Charge model; max_buy_turnover solves for the charge-inclusive size
+        """
+        budget = min(cash, equity * self.fraction)
+        quantity = charges.max_buy_turnover(budget) / price
+        if self.lot_size:
+            quantity = np.floor(quantity / self.lot_size) * self.lot_size
+        return max(quantity, 0.0)
+
+
+class Order:
+    def __init__(self, side, bar, order_type='market', limit_price=None, stop_price=None,
+                 quantity=None, valid_for=None):
+        """
+        A single order for the event-driven path
+
+        Parameters:
+        side: BUY (1) or SELL (-1)
+        bar: Bar position at which the order is placed; it can fill from the next bar
+        order_type: 'market', 'limit' or 'stop'
+        limit_price: Limit price for limit orders
+        stop_price: Trigger price for stop orders (filled as a market order once touched)
+        quantity: Shares to trade (None = sizer for buys, whole position for sells)
+        valid_for: Bars the order stays open (None = good till cancelled)
+        """
+        if order_type not in ('market', 'limit', 'stop'):
+            raise ValueError("order_type must be 'market', 'limit' or 'stop'")
+        self.side = side
+        self.bar = bar
+        self.order_type = order_type
+        self.limit_price = limit_price
+        self.stop_price = stop_price
+        self.quantity = quantity
+        self.valid_for = valid_for
+        self.done = False
+
+    def trigger_price(self, open_, high, low):
+        """Fill price on this bar before slippage, or None if the order does not fill"""
+        if self.order_type == 'market':
+            return open_
+        if self.order_type == 'limit':
+            if self.side == BUY and low <= self.limit_price:
+                return min(open_, self.limit_price)
+            if self.side == SELL and high >= self.limit_price:
+                return max(open_, self.limit_price)
+            return None
+        if self.side == BUY and high >= self.stop_price:
+            return max(open_, self.stop_price)
+        if self.side == SELL and low <= self.stop_price:
+            return min(open_, self.stop_price)
+        return None
+
+
+class ExecutionEngine:
+    def __init__(self, charges=None, slippage=None, sizer=None, initial_capital=10000):
+        """
+        Order execution with next-open fills, charges, slippage and position sizing
+
+        Plain long/flat signals take a fast path: only the bars where the signal
+        changes are visited, and the equity curve between trades is filled in
+        vectorized. Stops, take-profits and explicit limit/stop orders are
+        path-dependent and go through a bar-by-bar event loop instead.
+
+        Parameters:
+        charges: Charges model with compute(side, turnover) (default IndianEquityCharges())
+        slippage: Slippage model with fraction(open, high, low, close) (default FixedSlippage())
+        sizer: PositionSizer (default all-in, fractional shares)
+        initial_capital: Starting cash
+        """
+        self.charges = charges or IndianEquityCharges()
+        self.slippage = slippage or FixedSlippage()
+        self.sizer = sizer or PositionSizer()
+        self.initial_capital = initial_capital
+
+    def _arrays(self, data):
+        open_, high, low, close = (data[col].to_numpy(dtype=np.float64)
+                                   for col in ('Open', 'High', 'Low', 'Close'))
+        return open_, high, low, close, self.slippage.fraction(open_, high, low, close)
+
+    def _fill(self, side, bar, price, quantity, cash, position, slip):
+        """Apply one fill and return (cash, position, trade record) or None if nothing traded"""
+        fill_price = price * (1 + side * slip)
+        if side == BUY:
+            equity = cash + position * fill_price
+            if quantity is None:
+                quantity = self.sizer.quantity(cash, equity, fill_price, self.charges)
+            if quantity <= 0:
+                return None
+            turnover = quantity * fill_price
+            charges = self.charges.compute(BUY, turnover)
+            cash -= turnover + charges
+            position += quantity
+        else:
+            quantity = position if quantity is None else min(quantity, position)
+            if quantity <= 0:
+                return None
+            turnover = quantity * fill_price
+            charges = self.charges.compute(SELL, turnover)
+            cash += turnover - charges
+            position -= quantity
+        return cash, position, (bar, side, quantity, fill_price, charges)
+
+    def _result(self, data, close, cash, position, trades):
+        equity = cash + position * close
+        trades = pd.DataFrame(trades, columns=['bar', 'side', 'quantity', 'price', 'charges'])
+        trades.insert(0, 'date', data.index[trades['bar'].to_numpy(dtype=np.int64)])
+        return {
+            'equity': pd.Series(equity, index=data.index, name='Portfolio_Value'),
+            'cash': pd.Series(cash, index=data.index, name='Cash'),
+            'position': pd.Series(position, index=data.index, name='Position'),
+            'trades': trades,
+            'total_charges': float(trades['charges'].sum()),
+        }
+
+    def run_signals(self, data, signal):
+        """
+        Fast path: trade a long/flat signal with market orders filled at the next open
+
+        Parameters:
+        data: OHLCV DataFrame
+        signal: 1 (long) / 0 (flat) per bar, decided on the bar's close
+        """
+        open_, high, low, close, slip = self._arrays(data)
+        signal = np.asarray(signal, dtype=np.int8)
+
+        # A change on bar t's close becomes a market order filled at bar t + 1's open
+        changes = np.flatnonzero(np.diff(signal, prepend=0)[:-1] != 0) + 1
+        sides = np.where(signal[changes - 1] > 0, BUY, SELL)
+
+        cash, position = float(self.initial_capital), 0.0
+        trades = []
+        cash_after = np.empty(len(changes))
+        position_after = np.empty(len(changes))
+        for k, (bar, side) in enumerate(zip(changes, sides)):
+            filled = self._fill(side, bar, open_[bar], None, cash, position, slip[bar])
+            if filled is not None:
+                cash, position, trade = filled
+                trades.append(trade)
+            cash_after[k], position_after[k] = cash, position
+
+        # Carry the state after each fill forward to every later bar
+        last_fill = np.searchsorted(changes, np.arange(len(close)), side='right') - 1
+        cash_path = np.concatenate([[float(self.initial_capital)], cash_after])[last_fill + 1]
+        position_path = np.concatenate([[0.0], position_after])[last_fill + 1]
+        return self._result(data, close, cash_path, position_path, trades)
+
+    def run_orders(self, data, orders=(), signal=None, stop_loss=None, take_profit=None):
+        """
+        Event-driven path for limit/stop orders and protective exits
+
+        Parameters:
+        data: OHLCV DataFrame
+        orders: Explicit Order objects
+        signal: Optional long/flat signal turned into next-open market orders
+        stop_loss: Exit a long position once price falls this fraction below the entry
+        take_profit: Exit a long position once price rises this fraction above the entry
+
+        Protective exits become active on the bar after the entry fill.
+        """
+        open_, high, low, close, slip = self._arrays(data)
+        n = len(close)
+        signal_changes = np.zeros(n, dtype=np.int8)
+        if signal is not None:
+            signal = np.asarray(signal, dtype=np.int8)
+            signal_changes[1:] = np.diff(signal)
+            signal_changes[0] = signal[0]
+
+        pending_by_bar = {}
+        for order in orders:
+            pending_by_bar.setdefault(order.bar + 1, []).append(order)
+
+        cash, position = float(self.initial_capital), 0.0
+        cash_path = np.empty(n)
+        position_path = np.empty(n)
+        trades = []
+        pending = []
+        exits = []
+
+        for bar in range(n):
+            pending.extend(pending_by_bar.pop(bar, ()))
+
+            # Protective exits are checked before new orders on the same bar
+            for order in exits + pending:
+                if order.valid_for is not None and bar > order.bar + order.valid_for:
+                    order.done = True
+                    continue
+                price = order.trigger_price(open_[bar], high[bar], low[bar])
+                if price is None:
+                    continue
+                order.done = True
+                # Limit orders fill at their limit or better, never with adverse slippage
+                order_slip = 0.0 if order.order_type == 'limit' else slip[bar]
+                filled = self._fill(order.side, bar, price, order.quantity, cash, position, order_slip)
+                if filled is None:
+                    continue
+                cash, position, trade = filled
+                trades.append(trade)
+                if order in exits or position == 0:
+                    exits = []
+                if order.side == BUY and (stop_loss or take_profit):
+                    entry = trade[3]
+                    exits = [Order(SELL, bar, 'stop', stop_price=entry * (1 - stop_loss))] if stop_loss else []
+                    if take_profit:
+                        exits.append(Order(SELL, bar, 'limit', limit_price=entry * (1 + take_profit)))
+            pending = [order for order in pending if not order.done]
+            exits = [order for order in exits if not order.done]
+
+            # Signal changes on this close become market orders for the next open
+            if signal_changes[bar] > 0:
+                pending_by_bar.setdefault(bar + 1, []).append(Order(BUY, bar))
+            elif signal_changes[bar] < 0:
+                pending_by_bar.setdefault(bar + 1, []).append(Order(SELL, bar))
+
+            cash_path[bar] = cash
+            position_path[bar] = position
+
+        return self._result(data, close, cash_path, position_path, trades)
+
+    def run(self, data, signal, stop_loss=None, take_profit=None):
+        """Execute a long/flat signal, using the fast path whenever no protective exits are set"""
+        if stop_loss is None and take_profit is None:
+            return self.run_signals(data, signal)
+        return self.run_orders(data, signal=signal, stop_loss=stop_loss, take_profit=take_profit)
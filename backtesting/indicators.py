@@ -0,0 +1,145 @@
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import NULL_PROFILER
+from sweep import rolling_means
+
+
+def sma(close, window):
+    """Simple moving average (NaN until the window is full)"""
+    return rolling_means(close, [window])[window]
+
+
+def ema(close, span):
+    """Exponential moving average, same as pandas ewm(span, adjust=False)"""
+    return pd.Series(close).ewm(span=span, adjust=False).mean().to_numpy()
+
+
+def rsi(close, window=14):
+    """Relative Strength Index with Wilder smoothing"""
+    delta = np.diff(np.asarray(close, dtype=np.float64), prepend=np.nan)
+    gains = pd.Series(np.clip(delta, 0, None))
+    losses = pd.Series(np.clip(-delta, 0, None))
+    avg_gain = gains.ewm(alpha=1 / window, adjust=False, min_periods=window).mean().to_numpy()
+    avg_loss = losses.ewm(alpha=1 / window, adjust=False, min_periods=window).mean().to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(avg_loss == 0, 100.0, 100 - 100 / (1 + avg_gain / avg_loss))
+
+
+def macd(close, fast=12, slow=26, signal=9):
+    """MACD line, signal line and histogram"""
+    macd_line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(macd_line, signal)
+    return macd_line, signal_line, macd_line - signal_line
+
+
+def bollinger(close, window=20, num_std=2.0):
+    """Bollinger middle, upper and lower bands"""
+    rolling = pd.Series(close).rolling(window)
+    middle = rolling.mean().to_numpy()
+    width = num_std * rolling.std().to_numpy()
+    return middle, middle + width, middle - width
+
+
+def atr(high, low, close, window=14):
+    """Average True Range with Wilder smoothing"""
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    previous_close = np.concatenate([[np.nan], np.asarray(close, dtype=np.float64)[:-1]])
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - previous_close), np.abs(low - previous_close)))
+    return pd.Series(true_range).ewm(alpha=1 / window, adjust=False, min_periods=window).mean().to_numpy()
+
+
+# name -> (function, price columns it reads)
+INDICATORS = {
+    'sma': (sma, ('Close',)),
+    'ema': (ema, ('Close',)),
+    'rsi': (rsi, ('Close',)),
+    'macd': (macd, ('Close',)),
+    'bollinger': (bollinger, ('Close',)),
+    'atr': (atr, ('High', 'Low', 'Close')),
+}
+
+
+def data_fingerprint(data, columns=('Open', 'High', 'Low', 'Close', 'Volume')):
+    """
+    Content hash of a price frame: timestamps and every value of `columns`
+
+    Changes whenever any bar changes (a back-adjusted history or a revised bar
+    in the middle), not only when the length or the endpoints do. It is one
+    pass over the frame's bytes, so callers compute it once per frame and pass
+    it along instead of rehashing per lookup.
+    """
+    digest = hashlib.sha256()
+    index = data.index
+    if isinstance(index, pd.DatetimeIndex):
+        digest.update(str(index.tz).encode())
+        index = index.tz_localize(None) if index.tz is not None else index
+        digest.update(index.as_unit('ns').asi8.tobytes())
+    else:
+        digest.update(np.asarray(index).tobytes())
+    for col in columns:
+        if col in data.columns:
+            digest.update(col.encode())
+            digest.update(np.ascontiguousarray(data[col].to_numpy(dtype=np.float64)).tobytes())
+    return digest.hexdigest()
+
+
+class IndicatorCache:
+    def __init__(self, max_entries=256):
+        """
+        LRU cache of computed indicators keyed by (symbol, data, indicator, parameters)
+
+        Parameters:
+        max_entries: Number of indicator results kept before the least recently
+                     used one is evicted
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, symbol, data, name, profiler=NULL_PROFILER, fingerprint=None, **params):
+        """
+        Return an indicator, computing it only on the first request
+
+        Parameters:
+        symbol: Symbol the data belongs to
+        data: OHLCV DataFrame
+        name: Indicator name (see INDICATORS)
+        profiler: Profiler recording the computation on a cache miss
+        fingerprint: data_fingerprint(data) if already computed
+        params: Indicator parameters, e.g. window=50
+        """
+        key = (symbol, fingerprint or data_fingerprint(data), name, tuple(sorted(params.items())))
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+        self.misses += 1
+        function, columns = INDICATORS[name]
+        with profiler.stage(f"indicator:{name}", rows=len(data), symbol=symbol, **params):
+            value = function(*(data[col].to_numpy(dtype=np.float64) for col in columns), **params)
+        # Results are shared between strategies, so protect them from in-place edits
+        for array in (value if isinstance(value, tuple) else (value,)):
+            array.flags.writeable = False
+        self._entries[key] = value
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+# Shared by every Backtester unless one is given explicitly
+default_cache = IndicatorCache()
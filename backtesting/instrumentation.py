@@ -0,0 +1,160 @@
+import functools
+import json
+import time
+import tracemalloc
+from datetime import datetime
+
+
+class _Stage:
+    def __init__(self, profiler, name, rows, fields):
+        self.profiler = profiler
+        self.name = name
+        self.rows = rows
+        self.fields = fields
+        self.peak = 0
+
+    def __enter__(self):
+        profiler = self.profiler
+        if profiler.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            # Hand the peak so far to the enclosing stages before resetting it
+            for stage in profiler._stack:
+                stage.peak = max(stage.peak, peak - stage.memory_start)
+            tracemalloc.reset_peak()
+            self.memory_start = current
+        profiler._stack.append(self)
+        self.started_at = datetime.now()
+        self.cpu_start = time.process_time()
+        self.wall_start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self.wall_start
+        cpu = time.process_time() - self.cpu_start
+        profiler = self.profiler
+        profiler._stack.pop()
+
+        record = {
+            'stage': self.name,
+            'started_at': self.started_at.isoformat(timespec='microseconds'),
+            'wall_time': wall,
+            'cpu_time': cpu,
+            'rows': self.rows,
+        }
+        if profiler.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            self.peak = max(self.peak, peak - self.memory_start)
+            for stage in profiler._stack:
+                stage.peak = max(stage.peak, peak - stage.memory_start)
+            record['allocated_bytes'] = current - self.memory_start
+            record['peak_bytes'] = self.peak
+        record.update(self.fields)
+        profiler.records.append(record)
+        return False
+
+
+class _NullStage:
+    """Shared do-nothing stage returned while profiling is disabled"""
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class NullProfiler:
+    """Profiler stand-in that records nothing; stage() is a constant no-op"""
+    enabled = False
+    records = ()
+
+    def stage(self, name, rows=None, **fields):
+        return _NULL_STAGE
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class Profiler:
+    enabled = True
+
+    def __init__(self, trace_memory=True):
+        """
+        Opt-in instrumentation for pipeline stages
+
+        Wrap a stage in `with profiler.stage('name', rows=n) as stage:` to record
+        its wall time, CPU time, allocated/peak memory (via tracemalloc) and row
+        count. Set stage.rows inside the block when the count is only known at
+        the end. Nested stages are allowed.
+
+        Parameters:
+        trace_memory: Track memory with tracemalloc (adds allocation overhead)
+        """
+        self.trace_memory = trace_memory
+        self.records = []
+        self._stack = []
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def stage(self, name, rows=None, **fields):
+        """
+        Context manager recording one stage
+
+        Parameters:
+        name: Stage name (e.g. 'fetch_data', 'indicator:sma')
+        rows: Rows processed, if known up front
+        fields: Extra values stored with the record (e.g. symbol='TCS.NS')
+        """
+        return _Stage(self, name, rows, fields)
+
+    def to_dicts(self):
+        return list(self.records)
+
+    def to_jsonl(self, path):
+        """Append the records to a JSON lines file"""
+        with open(path, 'a') as f:
+            for record in self.records:
+                f.write(json.dumps(record, default=str) + '\n')
+
+    def summary(self):
+        """Per-stage totals as a DataFrame, slowest stage first"""
+        import pandas as pd
+
+        if not self.records:
+            return pd.DataFrame()
+        frame = pd.DataFrame(self.records)
+        aggregations = {'calls': ('wall_time', 'size'), 'wall_time': ('wall_time', 'sum'),
+                        'cpu_time': ('cpu_time', 'sum'), 'rows': ('rows', 'sum')}
+        if 'peak_bytes' in frame:
+            aggregations['peak_mb'] = ('peak_bytes', lambda peak: peak.max() / 2 ** 20)
+        return frame.groupby('stage').agg(**aggregations).sort_values('wall_time', ascending=False)
+
+    def print_summary(self):
+        print(self.summary().to_string(float_format=lambda value: f"{value:.4f}"))
+
+
+def profiled(name):
+    """
+    Decorator recording a method as a stage of `self.profiler`
+
+    Meant for pipeline classes with `profiler` and `data` attributes (like
+    Backtester); the row count is taken from len(self.data) after the call.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if not self.profiler.enabled:
+                return method(self, *args, **kwargs)
+            with self.profiler.stage(name, symbol=getattr(self, 'symbol', None)) as stage:
+                result = method(self, *args, **kwargs)
+                stage.rows = len(self.data) if self.data is not None else 0
+            return result
+        return wrapper
+    return decorator
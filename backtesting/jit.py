@@ -0,0 +1,43 @@
+import functools
+
+# Below this many elements the pure NumPy/Python path is faster than paying
+# for the numba import and cached-compile load on a cold start
+JIT_MIN_SIZE = 100_000
+
+
+def lazy_njit(function, fallback=None, min_size=JIT_MIN_SIZE):
+    """
+    Compile a kernel with numba on its first large call instead of at import
+
+    Importing numba costs a few hundred milliseconds, which dominated short
+    CLI runs on small data. The wrapped kernel runs `fallback` (or the plain
+    Python function) until a call covers min_size bars, then imports numba
+    once and uses the compiled version from then on.
+
+    numba is optional (the `jit` extra). Without it, and for any series
+    shorter than min_size (every daily backtest), the fallback is the path
+    that actually runs, so fallbacks must be efficient in their own right.
+
+    Parameters:
+    function: Kernel written in the numba-compatible subset of Python/NumPy
+    fallback: Equivalent implementation for small inputs (defaults to function)
+    min_size: Bar count from which the compiled kernel is used
+
+    The wrapped kernel takes the bar count as the first argument's length, or
+    from a `bars` keyword when the arrays passed are a subset (e.g. trade bars).
+    """
+    fallback = fallback or function
+    compiled = []
+
+    @functools.wraps(function)
+    def wrapper(*args, bars=None):
+        if (len(args[0]) if bars is None else bars) < min_size:
+            return fallback(*args)
+        if not compiled:
+            try:
+                from numba import njit
+                compiled.append(njit(cache=True)(function))
+            except ImportError:
+                compiled.append(fallback)
+        return compiled[0](*args)
+    return wrapper
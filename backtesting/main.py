@@ -1,14 +1,14 @@
-from tracemalloc import start
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import yfinance as yf
 from datetime import datetime, timedelta
 import warnings
+from data_cache import OHLCVCache
 warnings.filterwarnings('ignore')
 
 class Backtester:
-    def __init__(self, symbol, start_date, end_date, initial_capital=100000):
+    def __init__(self, symbol, start_date, end_date, initial_capital=100000, cache=None):
         """
         Initialize the Backtester with stock data 
 
@@ -17,20 +17,25 @@ class Backtester:
         start_date: Start Date for Backtesting (YYYY-MM-DD)
         end_date: End Date for Backtesting (YYYY-MM-DD)
         initial_capital: Starting Capital for Trading
+        cache: Optional OHLCVCache to reuse previously downloaded data
         """
         self.symbol = symbol
         self.start_date = start_date
         self.end_date = end_date
         self.initial_capital = initial_capital
         self.historical_data = None
+        self.cache = cache
 
     def get_data(self):
         """
         Fetch data from Yahoo Finance
         """
         try:
-            ticker = yf.Ticker(self.symbol)
-            self.data = ticker.history(start=self.start_date, end=self.end_date)
+            if self.cache is not None:
+                self.data = self.cache.get(self.symbol, self.start_date, self.end_date)
+            else:
+                ticker = yf.Ticker(self.symbol)
+                self.data = ticker.history(start=self.start_date, end=self.end_date)
             print(f"Data Fetched for {self.symbol}: {len(self.data)} days")
             return True
         except Exception as e:
@@ -65,6 +70,6 @@ class Backtester:
 if __name__ == "__main__":
 
     today_date = datetime.now().strftime('%Y-%m-%d')
-    bt_ex = Backtester('TCS.NS', '2000-01-01', today_date, 10000)
+    bt_ex = Backtester('TCS.NS', '2000-01-01', today_date, 10000, cache=OHLCVCache())
     bt_ex.get_data()
     bt_ex.moving_average_strategy()
\ No newline at end of file
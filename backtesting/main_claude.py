@@ -1,13 +1,19 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import yfinance as yf
 from datetime import datetime, timedelta
 import warnings
+from data_cache import COLUMNS as OHLCV_COLUMNS, OHLCVCache
+from indicators import data_fingerprint, default_cache
+from instrumentation import NULL_PROFILER, Profiler, profiled
+from metrics import format_metrics, performance_metrics
+from strategies import Indicators, SMACrossover
+from sweep import sma_crossover_sweep
+from timeframes import default_timeframes, periods_per_year
 warnings.filterwarnings('ignore')
 
 class Backtester:
-    def __init__(self, symbol, start_date, end_date, initial_capital=10000):
+    def __init__(self, symbol, start_date, end_date, initial_capital=10000, cache=None, indicators=None,
+                 profiler=None, interval='1d', results=None):
         """
         Initialize the backtester with stock data
         
@@ -16,26 +22,44 @@ class Backtester:
         start_date: Start date for backtesting (YYYY-MM-DD)
         end_date: End date for backtesting (YYYY-MM-DD)
         initial_capital: Starting capital for trading
+        cache: Optional OHLCVCache; only date ranges not yet cached are downloaded
+        indicators: IndicatorCache shared between strategies (defaults to a process-wide cache)
+        profiler: Optional instrumentation.Profiler recording every pipeline stage
+        interval: Bar interval to fetch (e.g. '1d', '1h', '15m', '1m'); annualization follows it
+        results: Optional result_cache.ResultCache serving repeated backtest() runs and sweeps
         """
         self.symbol = symbol
         self.start_date = start_date
         self.end_date = end_date
         self.initial_capital = initial_capital
+        self.cache = cache
+        self.indicators = indicators or default_cache
+        self.profiler = profiler or NULL_PROFILER
+        self.interval = interval
+        self.results = results
         self.data = None
         self.signals = None
         self.portfolio = None
         
+    @profiled('fetch_data')
     def fetch_data(self):
         """Fetch historical data using yfinance"""
         try:
-            ticker = yf.Ticker(self.symbol)
-            self.data = ticker.history(start=self.start_date, end=self.end_date)
-            print(f"Data fetched for {self.symbol}: {len(self.data)} days")
+            if self.cache is not None:
+                self.data = self.cache.get(self.symbol, self.start_date, self.end_date, self.interval)
+            else:
+                import yfinance as yf
+                ticker = yf.Ticker(self.symbol)
+                self.data = ticker.history(start=self.start_date, end=self.end_date, interval=self.interval)
+                # Keep only the columns the pipeline uses (drops Dividends, Stock Splits, ...)
+                self.data = self.data[[col for col in OHLCV_COLUMNS if col in self.data.columns]]
+            print(f"Data fetched for {self.symbol}: {len(self.data)} bars ({self.interval})")
             return True
         except Exception as e:
             print(f"Error fetching data: {e}")
             return False
     
+    @profiled('moving_average_strategy')
     def moving_average_strategy(self, short_window=20, long_window=50):
         """
         Implement a simple moving average crossover strategy
@@ -48,21 +72,161 @@ class Backtester:
             print("No data available. Please fetch data first.")
             return
         
-        # Calculate moving averages
-        self.data['SMA_short'] = self.data['Close'].rolling(window=short_window).mean()
-        self.data['SMA_long'] = self.data['Close'].rolling(window=long_window).mean()
+        # Moving averages come from the shared indicator cache
+        indicators = Indicators(self.indicators, self.symbol, self.data, self.profiler)
+        self.data['SMA_short'] = indicators.sma(window=short_window)
+        self.data['SMA_long'] = indicators.sma(window=long_window)
         
-        # Generate signals
-        self.data['Signal'] = 0
-        self.data['Signal'][short_window:] = np.where(
-            self.data['SMA_short'][short_window:] > self.data['SMA_long'][short_window:], 1, 0
-        )
+        self.run_strategy(SMACrossover(short_window, long_window), verbose=False)
+        print(f"Strategy signals generated: {short_window}-day SMA vs {long_window}-day SMA")
+    
+    @profiled('run_strategy')
+    def run_strategy(self, strategy, verbose=True):
+        """
+        Generate signals and positions from any Strategy
+        
+        Parameters:
+        strategy: Strategy instance (e.g. SMACrossover(50, 200), RSIReversion())
+        """
+        if self.data is None:
+            print("No data available. Please fetch data first.")
+            return
         
-        # Generate trading positions (1 for buy, 0 for sell)
-        self.data['Position'] = self.data['Signal'].diff()
+        indicators = Indicators(self.indicators, self.symbol, self.data, self.profiler)
+        self.data['Signal'] = strategy.generate_signals(indicators)
         
-        print(f"Strategy signals generated: {short_window}-day SMA vs {long_window}-day SMA")
+        # Generate trading positions (1 for buy, -1 for sell), int8 like the signal
+        signal = self.data['Signal'].to_numpy()
+        self.data['Position'] = np.diff(signal, prepend=signal[:1]).astype(np.int8)
+        
+        if verbose:
+            print(f"Strategy signals generated: {strategy}")
+    
+    @profiled('moving_average_sweep')
+    def moving_average_sweep(self, short_windows, long_windows):
+        """
+        Evaluate many SMA crossover window pairs at once without touching self.data
+        
+        Parameters:
+        short_windows: Candidate short-term windows (e.g. range(5, 60, 5))
+        long_windows: Candidate long-term windows (e.g. range(20, 250, 10))
+        
+        Returns a DataFrame of metrics per window pair, best Sharpe ratio first
+        """
+        if self.data is None:
+            print("No data available. Please fetch data first.")
+            return
+        
+        if self.results is not None:
+            from result_cache import cached_sma_sweep
+            results = cached_sma_sweep(
+                self.results, self.data['Close'].to_numpy(), short_windows, long_windows, self.initial_capital,
+                periods_per_year(self.data.index), digest=data_fingerprint(self.data, ('Close',))
+            )
+        else:
+            results = sma_crossover_sweep(
+                self.data['Close'].to_numpy(), short_windows, long_windows, self.initial_capital,
+                periods_per_year(self.data.index)
+            )
+        print(f"Swept {len(results)} window pairs")
+        return results
     
+    @profiled('walk_forward')
+    def walk_forward(self, short_windows, long_windows, train_size=756, test_size=252, processes=None):
+        """
+        Walk-forward optimization: tune windows on rolling training folds and
+        evaluate them on the following out-of-sample folds
+        
+        Parameters:
+        short_windows: Candidate short-term windows
+        long_windows: Candidate long-term windows
+        train_size: Training bars per fold (756 = ~3 years of daily bars)
+        test_size: Out-of-sample bars per fold (252 = ~1 year)
+        processes: Worker processes for the folds (None = CPU count)
+        """
+        if self.data is None:
+            print("No data available. Please fetch data first.")
+            return
+        
+        from walk_forward import walk_forward
+        
+        return walk_forward(self.data['Close'], short_windows, long_windows, train_size, test_size,
+                            initial_capital=self.initial_capital, processes=processes,
+                            periods_per_year=periods_per_year(self.data.index))
+    
+    @profiled('robustness')
+    def robustness(self, n_paths=10000, method='stationary', block_size=20, seed=None, max_memory_mb=256):
+        """
+        Bootstrap the strategy returns to see how much Sharpe, drawdown and final
+        value could vary on paths like the historical one
+        
+        Parameters:
+        n_paths: Resampled paths
+        method: 'stationary', 'block' or 'shuffle'
+        block_size: Mean or fixed block length in bars
+        seed: Random seed
+        max_memory_mb: Memory budget per chunk of paths
+        """
+        if self.data is None or 'Strategy_Returns' not in self.data.columns:
+            print("No returns available. Please calculate returns first.")
+            return
+        
+        from robustness import robustness_test
+        
+        return robustness_test(self.data['Strategy_Returns'].to_numpy(), n_paths, method, block_size,
+                               self.initial_capital, periods_per_year(self.data.index), seed=seed,
+                               max_memory_mb=max_memory_mb)
+    
+    def price_store(self, columns=('Close',), price_dtype=np.float32):
+        """
+        Compact copy of the fetched data: only `columns`, float32 prices, and
+        returns/signals/equity derived on demand instead of stored as columns
+        
+        Parameters:
+        columns: Columns to keep (e.g. ('Open', 'Close', 'Volume'))
+        price_dtype: dtype for prices (np.float64 for bit-exact prices)
+        """
+        if self.data is None:
+            print("No data available. Please fetch data first.")
+            return
+        
+        from price_store import PriceStore
+        
+        return PriceStore.from_frame(self.data, columns, price_dtype)
+    
+    def resampled(self, *rules):
+        """
+        Fetched bars resampled to other timeframes, built once per session
+        
+        Parameters:
+        rules: Target timeframes (e.g. '15min', '1h', '1D')
+        
+        Returns a DataFrame for one rule, or a dict of rule -> DataFrame
+        """
+        if self.data is None:
+            print("No data available. Please fetch data first.")
+            return
+        
+        frames = default_timeframes.build(self.symbol, self.data, rules)
+        return frames[rules[0]] if len(rules) == 1 else frames
+    
+    def streaming_strategy(self, short_window=20, long_window=50):
+        """
+        Build an incremental SMA crossover engine warmed up on the fetched data
+        
+        Feed further bars with engine.update(close) to get live signals without
+        recomputing the whole history.
+        """
+        if self.data is None:
+            print("No data available. Please fetch data first.")
+            return
+        
+        from streaming import StreamingSMACrossover
+        
+        engine = StreamingSMACrossover(short_window, long_window, self.initial_capital)
+        return engine.warm_up(self.data['Close'].to_numpy())
+    
+    @profiled('calculate_returns')
     def calculate_returns(self):
         """Calculate portfolio returns and performance metrics"""
         if self.data is None or 'Signal' not in self.data.columns:
@@ -84,118 +248,133 @@ class Backtester:
         
         print("Returns calculated successfully")
     
-    def get_performance_metrics(self):
-        """Calculate and display performance metrics"""
+    @profiled('execute')
+    def execute(self, engine=None, stop_loss=None, take_profit=None):
+        """
+        Re-price the current signals with realistic fills instead of close-to-close returns
+        
+        Orders fill at the next bar's open with charges, slippage and position
+        sizing from the engine. Overwrites Strategy_Returns and Portfolio_Value,
+        so get_performance_metrics and plot_results reflect the net results.
+        
+        Parameters:
+        engine: execution.ExecutionEngine (defaults to Indian delivery charges and 5 bps slippage)
+        stop_loss: Optional protective stop as a fraction below the entry price
+        take_profit: Optional profit target as a fraction above the entry price
+        """
+        if self.data is None or 'Signal' not in self.data.columns:
+            print("No signals available. Please run a strategy first.")
+            return
+        
+        if engine is None:
+            from execution import ExecutionEngine
+            engine = ExecutionEngine(initial_capital=self.initial_capital)
+        result = engine.run(self.data, self.data['Signal'].to_numpy(), stop_loss, take_profit)
+        
+        self.data['Returns'] = self.data['Close'].pct_change()
+        self.data['Portfolio_Value'] = result['equity']
+        self.data['Strategy_Returns'] = result['equity'].pct_change()
+        self.data['Cumulative_Returns'] = (1 + self.data['Returns']).cumprod()
+        self.data['Cumulative_Strategy_Returns'] = result['equity'] / engine.initial_capital
+        self.portfolio = result
+        
+        print(f"Executed {len(result['trades'])} orders, charges paid: {result['total_charges']:.2f}")
+        return result
+    
+    @profiled('backtest')
+    def backtest(self, strategy, execute=False, stop_loss=None, take_profit=None):
+        """
+        Run a strategy through returns (or execution) and metrics in one call
+        
+        With a result cache, a run whose strategy, settings, code and data all
+        match an earlier one returns the stored equity curve and metrics without
+        recomputing; self.data then only holds the fetched bars.
+        
+        Parameters:
+        strategy: Strategy instance (e.g. SMACrossover(50, 200))
+        execute: Re-price with the default ExecutionEngine instead of close-to-close returns
+        stop_loss, take_profit: Passed to execute (either one implies execute)
+        
+        Returns a dict with 'equity' (portfolio value Series), 'metrics' and 'cached'
+        """
         if self.data is None:
+            print("No data available. Please fetch data first.")
             return
         
-        # Remove NaN values for calculations
-        strategy_returns = self.data['Strategy_Returns'].dropna()
-        market_returns = self.data['Returns'].dropna()
-        
-        # Calculate metrics
-        total_return = (self.data['Portfolio_Value'].iloc[-1] - self.initial_capital) / self.initial_capital
-        market_return = (self.data['Cumulative_Returns'].iloc[-1] - 1)
-        
-        # Annualized returns (assuming 252 trading days per year)
-        days = len(strategy_returns)
-        annualized_return = (1 + total_return) ** (252 / days) - 1
-        annualized_market_return = (1 + market_return) ** (252 / days) - 1
-        
-        # Volatility (annualized)
-        strategy_volatility = strategy_returns.std() * np.sqrt(252)
-        market_volatility = market_returns.std() * np.sqrt(252)
-        
-        # Sharpe ratio (assuming risk-free rate of 2%)
-        risk_free_rate = 0.02
-        sharpe_ratio = (annualized_return - risk_free_rate) / strategy_volatility if strategy_volatility != 0 else 0
-        
-        # Maximum drawdown
-        cumulative = self.data['Cumulative_Strategy_Returns'].fillna(1)
-        running_max = cumulative.cummax()
-        drawdown = (cumulative - running_max) / running_max
-        max_drawdown = drawdown.min()
-        
-        # Win rate
-        winning_trades = strategy_returns[strategy_returns > 0]
-        win_rate = len(winning_trades) / len(strategy_returns[strategy_returns != 0]) if len(strategy_returns[strategy_returns != 0]) > 0 else 0
-        
-        metrics = {
-            'Total Return': f"{total_return:.2%}",
-            'Market Return': f"{market_return:.2%}",
-            'Annualized Return': f"{annualized_return:.2%}",
-            'Annualized Market Return': f"{annualized_market_return:.2%}",
-            'Volatility': f"{strategy_volatility:.2%}",
-            'Sharpe Ratio': f"{sharpe_ratio:.2f}",
-            'Maximum Drawdown': f"{max_drawdown:.2%}",
-            'Win Rate': f"{win_rate:.2%}",
-            'Total Trades': len(strategy_returns[strategy_returns != 0]),
-            'Final Portfolio Value': f"${self.data['Portfolio_Value'].iloc[-1]:,.2f}"
-        }
-        
-        return metrics
-    
-    def plot_results(self):
-        """Plot the backtesting results"""
+        execute = execute or stop_loss is not None or take_profit is not None
+        key = None
+        if self.results is not None:
+            key = self.results.key(kind='backtest', symbol=self.symbol, interval=self.interval,
+                                   data=data_fingerprint(self.data), strategy=repr(strategy),
+                                   initial_capital=self.initial_capital, execute=execute,
+                                   stop_loss=stop_loss, take_profit=take_profit)
+            entry = self.results.get(key)
+            if entry is not None:
+                equity = pd.Series(entry['equity'], index=self.data.index, name='Portfolio_Value')
+                return {'equity': equity, 'metrics': entry['metrics'], 'cached': True}
+        
+        self.run_strategy(strategy, verbose=False)
+        if execute:
+            self.execute(stop_loss=stop_loss, take_profit=take_profit)
+        else:
+            self.calculate_returns()
+        metrics = self.get_performance_metrics()
+        equity = self.data['Portfolio_Value']
+        
+        if key is not None:
+            self.results.put(key, metrics, equity=equity.to_numpy(dtype=np.float64))
+        return {'equity': equity, 'metrics': metrics, 'cached': False}
+    
+    @profiled('get_performance_metrics')
+    def get_performance_metrics(self):
+        """Calculate performance metrics (numeric values, see format_metrics for display)"""
+        if self.data is None or 'Strategy_Returns' not in self.data.columns:
+            return
+        
+        # One contiguous pass over the returns; the first bar has no return
+        strategy_returns = self.data['Strategy_Returns'].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(strategy_returns)
+        market_returns = self.data['Returns'].to_numpy(dtype=np.float64)[valid]
+        positions = self.data['Signal'].shift(1).to_numpy(dtype=np.float64)[valid]
+        
+        return performance_metrics(
+            strategy_returns[valid], np.nan_to_num(market_returns), positions, self.initial_capital,
+            periods_per_year(self.data.index)
+        )
+    
+    @profiled('plot_results')
+    def plot_results(self, save_path=None, max_points=None):
+        """
+        Plot the backtesting results
+        
+        Parameters:
+        save_path: Render headlessly to this PNG/SVG file instead of opening a window
+        max_points: Downsample each line to about this many points (LTTB, drawdown
+                    min/max); defaults to every bar on screen and 2000 points for files
+        """
         if self.data is None:
             return
         
-        fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(12, 10))
-        
-        # Plot 1: Price and Moving Averages
-        ax1.plot(self.data.index, self.data['Close'], label='Close Price', linewidth=1)
-        if 'SMA_short' in self.data.columns:
-            ax1.plot(self.data.index, self.data['SMA_short'], label='Short MA', alpha=0.7)
-            ax1.plot(self.data.index, self.data['SMA_long'], label='Long MA', alpha=0.7)
-        
-        # Mark buy/sell signals
-        if 'Position' in self.data.columns:
-            buy_signals = self.data[self.data['Position'] == 1]
-            sell_signals = self.data[self.data['Position'] == -1]
-            
-            ax1.scatter(buy_signals.index, buy_signals['Close'], color='green', 
-                       marker='^', s=100, label='Buy Signal')
-            ax1.scatter(sell_signals.index, sell_signals['Close'], color='red', 
-                       marker='v', s=100, label='Sell Signal')
-        
-        ax1.set_title(f'{self.symbol} - Price and Signals')
-        ax1.legend()
-        ax1.grid(True, alpha=0.3)
-        
-        # Plot 2: Portfolio Value vs Buy & Hold
-        if 'Portfolio_Value' in self.data.columns:
-            ax2.plot(self.data.index, self.data['Portfolio_Value'], 
-                    label='Strategy Portfolio', linewidth=2)
-            
-            # Buy & Hold comparison
-            buy_hold_value = self.initial_capital * self.data['Cumulative_Returns']
-            ax2.plot(self.data.index, buy_hold_value, 
-                    label='Buy & Hold', linewidth=2, alpha=0.7)
-            
-            ax2.set_title('Portfolio Value Comparison')
-            ax2.set_ylabel('Portfolio Value ($)')
-            ax2.legend()
-            ax2.grid(True, alpha=0.3)
-        
-        # Plot 3: Drawdown
-        if 'Cumulative_Strategy_Returns' in self.data.columns:
-            cumulative = self.data['Cumulative_Strategy_Returns'].fillna(1)
-            running_max = cumulative.cummax()
-            drawdown = (cumulative - running_max) / running_max
-            
-            ax3.fill_between(self.data.index, drawdown, alpha=0.3, color='red')
-            ax3.plot(self.data.index, drawdown, color='red', linewidth=1)
-            ax3.set_title('Strategy Drawdown')
-            ax3.set_ylabel('Drawdown (%)')
-            ax3.set_xlabel('Date')
-            ax3.grid(True, alpha=0.3)
-        
-        plt.tight_layout()
+        from rendering import draw_report, render_report
+        
+        if save_path is not None:
+            return render_report(self.data, save_path, self.symbol, self.initial_capital,
+                                 max_points=max_points or 2000)
+        
+        import matplotlib.pyplot as plt
+        
+        fig = plt.figure(figsize=(12, 10))
+        draw_report(fig, self.data, self.symbol, self.initial_capital, max_points)
         plt.show()
 
 # Example usage and demonstration
-def run_example_backtest():
-    """Run a complete example backtest"""
+def run_example_backtest(profile=False):
+    """
+    Run a complete example backtest
+    
+    Parameters:
+    profile: Record and print per-stage timings and memory
+    """
     print("=== Trading Strategy Backtesting Demo ===\n")
     
     # Initialize backtester
@@ -203,7 +382,9 @@ def run_example_backtest():
         symbol='AAPL',
         start_date='2020-01-01',
         end_date='2024-01-01',
-        initial_capital=10000
+        initial_capital=10000,
+        cache=OHLCVCache(),
+        profiler=Profiler() if profile else None
     )
     
     # Fetch data
@@ -221,7 +402,7 @@ def run_example_backtest():
     
     # Get performance metrics
     print("\n4. Performance Metrics:")
-    metrics = bt.get_performance_metrics()
+    metrics = format_metrics(bt.get_performance_metrics())
     for key, value in metrics.items():
         print(f"{key}: {value}")
     
@@ -229,6 +410,10 @@ def run_example_backtest():
     print("\n5. Plotting results...")
     bt.plot_results()
     
+    if profile:
+        print("\n6. Stage profile:")
+        bt.profiler.print_summary()
+    
     return bt
 
 # Run the example
@@ -244,4 +429,9 @@ if __name__ == "__main__":
     # my_bt.moving_average_strategy(10, 30)  # Different parameters
     # my_bt.calculate_returns()
     # print(my_bt.get_performance_metrics())
-    # my_bt.plot_results()
\ No newline at end of file
+    # my_bt.plot_results()
+    # print(my_bt.moving_average_sweep(range(5, 60, 5), range(20, 250, 10)).head())
+    # Intraday: 15-minute SMA entries filtered by the daily trend
+    # intraday_bt = Backtester('TCS.NS', '2024-01-01', '2024-02-15', 10000, interval='15m')
+    # intraday_bt.fetch_data()
+    # intraday_bt.run_strategy(MultiTimeframe(SMACrossover(8, 21), SMACrossover(5, 20), '1D'))
\ No newline at end of file
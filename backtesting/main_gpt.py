@@ -1,6 +1,7 @@
 import yfinance as yf
 import pandas as pd
 import matplotlib.pyplot as plt
+from simulator import simulate_portfolio
 
 # ---------------------------
 # Load Data
@@ -28,28 +29,12 @@ data['Position'] = data['Signal'].diff().fillna(0)
 # Backtest
 # ---------------------------
 initial_cash = 10000
-cash = initial_cash
-position = 0.0
-portfolio_values = []
-
-for idx, row in data.iterrows():
-    price = float(row['Close'])  # Ensure scalar
-    signal = float(row['Position'])  # Ensure scalar
-
-    # Buy
-    if signal == 1.0 and cash > 0:
-        position = cash / price
-        cash = 0.0
-
-    # Sell
-    elif signal == -1.0 and position > 0:
-        cash = position * price
-        position = 0.0
-
-    portfolio_value = cash + position * price
-    portfolio_values.append(portfolio_value)
-
-data['Portfolio'] = portfolio_values
+result = simulate_portfolio(
+    data['Close'].to_numpy().ravel(),
+    data['Position'].to_numpy().ravel(),
+    initial_cash=initial_cash,
+)
+data['Portfolio'] = result['portfolio']
 
 # ---------------------------
 # Plot Results
@@ -0,0 +1,176 @@
+import numpy as np
+
+from jit import lazy_njit
+
+PERCENT_METRICS = ('Total Return', 'Market Return', 'Annualized Return', 'Annualized Market Return',
+                   'Volatility', 'Market Volatility', 'Maximum Drawdown', 'Win Rate', 'Exposure')
+
+
+def _metrics_loop(strategy_returns, market_returns, positions):
+    """Single pass over the return arrays, accumulating every running statistic"""
+    cumulative = 1.0
+    market_cumulative = 1.0
+    high_water_mark = 1.0
+    max_drawdown = 0.0
+    mean = 0.0
+    m2 = 0.0
+    market_mean = 0.0
+    market_m2 = 0.0
+    downside_sq = 0.0
+    exposure = 0
+    trades = 0
+    winning_trades = 0
+    trade_growth = 1.0
+    in_trade = False
+
+    for i in range(len(strategy_returns)):
+        r = strategy_returns[i]
+        m = market_returns[i]
+
+        cumulative *= 1.0 + r
+        market_cumulative *= 1.0 + m
+        if cumulative > high_water_mark:
+            high_water_mark = cumulative
+        drawdown = (cumulative - high_water_mark) / high_water_mark
+        if drawdown < max_drawdown:
+            max_drawdown = drawdown
+
+        # Welford updates for strategy and market variance
+        delta = r - mean
+        mean += delta / (i + 1)
+        m2 += delta * (r - mean)
+        delta = m - market_mean
+        market_mean += delta / (i + 1)
+        market_m2 += delta * (m - market_mean)
+        if r < 0:
+            downside_sq += r * r
+
+        # Trade bookkeeping: a trade is a run of bars with a non-zero position
+        if positions[i] != 0:
+            exposure += 1
+            if not in_trade:
+                in_trade = True
+                trades += 1
+                trade_growth = 1.0
+            trade_growth *= 1.0 + r
+        elif in_trade:
+            in_trade = False
+            if trade_growth > 1.0:
+                winning_trades += 1
+    if in_trade and trade_growth > 1.0:
+        winning_trades += 1
+
+    n = len(strategy_returns)
+    variance = m2 / (n - 1) if n > 1 else 0.0
+    market_variance = market_m2 / (n - 1) if n > 1 else 0.0
+    return (cumulative, market_cumulative, variance, market_variance, downside_sq,
+            max_drawdown, exposure, trades, winning_trades)
+
+
+def _metrics_numpy(strategy_returns, market_returns, positions):
+    """Vectorized fallback producing the same statistics as _metrics_loop"""
+    n = len(strategy_returns)
+    growth = np.cumprod(1.0 + strategy_returns)
+    running_max = np.maximum(np.maximum.accumulate(growth), 1.0)
+
+    held = positions != 0
+    starts = np.flatnonzero(held & ~np.concatenate(([False], held[:-1])))
+    trade_growth = np.multiply.reduceat(np.where(held, 1.0 + strategy_returns, 1.0), starts) if len(starts) else starts
+
+    return (
+        growth[-1],
+        np.prod(1.0 + market_returns),
+        strategy_returns.var(ddof=1) if n > 1 else 0.0,
+        market_returns.var(ddof=1) if n > 1 else 0.0,
+        np.square(np.minimum(strategy_returns, 0.0)).sum(),
+        min(((growth - running_max) / running_max).min(), 0.0),
+        int(held.sum()),
+        len(starts),
+        int((trade_growth > 1.0).sum()),
+    )
+
+
+_metrics_kernel = lazy_njit(_metrics_loop, fallback=_metrics_numpy)
+
+
+def performance_metrics(strategy_returns, market_returns=None, positions=None, initial_capital=10000,
+                        periods_per_year=252, risk_free_rate=0.02):
+    """
+    Compute every backtest metric from contiguous float64 arrays
+
+    Series of JIT_MIN_SIZE bars or more run the single-pass loop compiled with
+    numba when it is installed; shorter series (every daily backtest) and
+    installs without numba use the vectorized NumPy fallback, the normal path.
+
+    Parameters:
+    strategy_returns: Per-bar strategy returns (NaNs already dropped)
+    market_returns: Per-bar buy & hold returns aligned with strategy_returns
+    positions: Position held during each bar (Signal shifted by one bar)
+    initial_capital: Starting capital for trading
+    periods_per_year: Bars per year used for annualization (252 for daily bars)
+    risk_free_rate: Annual risk-free rate used in Sharpe and Sortino ratios
+
+    Returns a dict of numeric metrics (use format_metrics for display)
+    """
+    strategy_returns = np.ascontiguousarray(strategy_returns, dtype=np.float64)
+    market_returns = (np.zeros_like(strategy_returns) if market_returns is None
+                      else np.ascontiguousarray(market_returns, dtype=np.float64))
+    positions = (np.ones_like(strategy_returns) if positions is None
+                 else np.ascontiguousarray(positions, dtype=np.float64))
+
+    days = len(strategy_returns)
+    if days == 0:
+        return {}
+
+    (cumulative, market_cumulative, variance, market_variance, downside_sq,
+     max_drawdown, exposure, trades, winning_trades) = _metrics_kernel(strategy_returns, market_returns, positions)
+
+    total_return = cumulative - 1
+    market_return = market_cumulative - 1
+    annualized_return = (1 + total_return) ** (periods_per_year / days) - 1
+    annualized_market_return = (1 + market_return) ** (periods_per_year / days) - 1
+
+    volatility = np.sqrt(variance * periods_per_year)
+    market_volatility = np.sqrt(market_variance * periods_per_year)
+    downside_volatility = np.sqrt(downside_sq / days * periods_per_year)
+
+    excess_return = annualized_return - risk_free_rate
+    return {
+        'Total Return': total_return,
+        'Market Return': market_return,
+        'Annualized Return': annualized_return,
+        'Annualized Market Return': annualized_market_return,
+        'Volatility': volatility,
+        'Market Volatility': market_volatility,
+        'Sharpe Ratio': excess_return / volatility if volatility != 0 else 0.0,
+        'Sortino Ratio': excess_return / downside_volatility if downside_volatility != 0 else 0.0,
+        'Calmar Ratio': annualized_return / -max_drawdown if max_drawdown != 0 else 0.0,
+        'Maximum Drawdown': max_drawdown,
+        'Win Rate': winning_trades / trades if trades > 0 else 0.0,
+        'Total Trades': trades,
+        'Exposure': exposure / days,
+        'Average Holding Period': exposure / trades if trades > 0 else 0.0,
+        'Final Portfolio Value': initial_capital * cumulative,
+    }
+
+
+def format_metrics(metrics):
+    """Format numeric metrics for printing"""
+    formatted = {}
+    for key, value in metrics.items():
+        if key in PERCENT_METRICS:
+            formatted[key] = f"{value:.2%}"
+        elif key == 'Final Portfolio Value':
+            formatted[key] = f"${value:,.2f}"
+        elif key == 'Total Trades':
+            formatted[key] = value
+        else:
+            formatted[key] = f"{value:.2f}"
+    return formatted
+
+
+def drawdown(cumulative):
+    """Drawdown series of a cumulative return curve"""
+    cumulative = np.asarray(cumulative, dtype=np.float64)
+    running_max = np.maximum.accumulate(cumulative)
+    return (cumulative - running_max) / running_max
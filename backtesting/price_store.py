@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+
+from sweep import rolling_means
+
+
+def _volume_dtype(volume):
+    """
+    Smallest integer type that holds the volume column exactly
+
+    Volume with NaNs (missing bars) or fractional values (e.g. crypto or
+    adjusted volume) has no exact integer form and stays float64.
+    """
+    volume = np.asarray(volume, dtype=np.float64)
+    if len(volume) == 0:
+        return np.uint32
+    if not np.isfinite(volume).all() or (volume != np.floor(volume)).any() or np.abs(volume).max() >= 2 ** 63:
+        return np.float64
+    if volume.min() >= 0 and volume.max() < 2 ** 32:
+        return np.uint32
+    return np.int64
+
+
+class PriceStore:
+    def __init__(self, index, columns):
+        """
+        Compact columnar price container for one symbol
+
+        Holds only the columns it is given (prices in float32 by default,
+        volume as an integer type when it is integral) and derives returns,
+        moving averages, signals and equity on demand instead of storing them.
+        Derived series are computed in float64 so no precision is lost in
+        compounding.
+
+        Parameters:
+        index: DatetimeIndex of the bars
+        columns: Dict of column name -> 1-D array
+        """
+        self.index = index
+        self.columns = columns
+
+    @classmethod
+    def from_frame(cls, frame, columns=('Close',), price_dtype=np.float32):
+        """
+        Build a store from an OHLCV DataFrame, keeping only `columns`
+
+        Parameters:
+        frame: DataFrame such as Backtester.data
+        columns: Columns to keep
+        price_dtype: dtype for price columns (np.float64 for bit-exact prices)
+        """
+        stored = {}
+        for col in columns:
+            values = frame[col].to_numpy()
+            dtype = _volume_dtype(values) if col == 'Volume' else price_dtype
+            stored[col] = np.ascontiguousarray(values, dtype=dtype)
+        return cls(frame.index, stored)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, col):
+        return self.columns[col]
+
+    @property
+    def nbytes(self):
+        return sum(values.nbytes for values in self.columns.values()) + self.index.nbytes
+
+    def close(self):
+        """Closing prices upcast to float64 for calculations"""
+        return self.columns['Close'].astype(np.float64)
+
+    def returns(self):
+        """Bar-to-bar returns (first bar NaN)"""
+        close = self.close()
+        returns = np.empty(len(close))
+        returns[0] = np.nan
+        np.divide(close[1:], close[:-1], out=returns[1:])
+        returns[1:] -= 1
+        return returns
+
+    def sma(self, window):
+        return rolling_means(self.close(), [window])[window]
+
+    def crossover_signal(self, short_window=20, long_window=50):
+        """SMA crossover signal as int8, same rules as Backtester.moving_average_strategy"""
+        means = rolling_means(self.close(), [short_window, long_window])
+        signal = np.zeros(len(self), dtype=np.int8)
+        with np.errstate(invalid='ignore'):
+            signal[short_window:] = means[short_window][short_window:] > means[long_window][short_window:]
+        return signal
+
+    def strategy_returns(self, signal):
+        """Returns earned holding yesterday's signal (first bar NaN)"""
+        returns = self.returns()
+        returns[1:] *= signal[:-1]
+        return returns
+
+    def equity(self, signal, initial_capital=10000):
+        """Portfolio value curve for a signal"""
+        strategy_returns = self.strategy_returns(signal)
+        strategy_returns[0] = 0.0
+        return initial_capital * np.cumprod(1 + strategy_returns)
+
+    def to_frame(self, signal=None, initial_capital=10000):
+        """Materialize a DataFrame (optionally with the derived strategy columns)"""
+        frame = pd.DataFrame({col: values for col, values in self.columns.items()}, index=self.index)
+        if signal is not None:
+            frame['Signal'] = signal
+            frame['Strategy_Returns'] = self.strategy_returns(signal)
+            frame['Portfolio_Value'] = self.equity(signal, initial_capital)
+        return frame
+
+
+class UniverseStore:
+    def __init__(self, symbols, index, prices):
+        """
+        Closing prices for many symbols in one contiguous (symbols x bars) block
+
+        Rows are exposed as PriceStore views, so per-symbol access never copies
+        the block.
+
+        Parameters:
+        symbols: Symbol per row
+        index: DatetimeIndex shared by all rows
+        prices: 2-D array, NaN where a symbol has no bar
+        """
+        self.symbols = list(symbols)
+        self.index = index
+        self.prices = prices
+        self._rows = {symbol: row for row, symbol in enumerate(self.symbols)}
+
+    @classmethod
+    def from_series(cls, closes, price_dtype=np.float32):
+        """
+        Align a dict of symbol -> close Series onto one index
+
+        Parameters:
+        closes: Dict of symbol -> close price Series
+        price_dtype: dtype of the price block (float32 halves memory)
+        """
+        frame = pd.DataFrame(closes).sort_index()
+        prices = np.ascontiguousarray(frame.to_numpy(dtype=price_dtype).T)
+        return cls(frame.columns, frame.index, prices)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def __getitem__(self, symbol):
+        return PriceStore(self.index, {'Close': self.prices[self._rows[symbol]]})
+
+    @property
+    def nbytes(self):
+        return self.prices.nbytes + self.index.nbytes
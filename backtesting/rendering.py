@@ -0,0 +1,242 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from jit import lazy_njit
+from metrics import drawdown
+
+# Columns draw_report reads; only these are sent to worker processes
+REPORT_COLUMNS = ('Close', 'SMA_short', 'SMA_long', 'Position', 'Portfolio_Value',
+                  'Cumulative_Returns', 'Cumulative_Strategy_Returns')
+
+
+def _lttb_loop(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets: keep the point of each bucket that forms
+    the largest triangle with the previously kept point and the next bucket's mean
+    """
+    n = len(x)
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0] = 0
+    kept[n_out - 1] = n - 1
+    bucket = (n - 2) / (n_out - 2)
+    previous = 0
+
+    for i in range(n_out - 2):
+        start = int(i * bucket) + 1
+        end = int((i + 1) * bucket) + 1
+        next_end = min(int((i + 2) * bucket) + 1, n)
+        if i == n_out - 3:
+            next_end = n
+        next_x = x[end:next_end].mean()
+        next_y = y[end:next_end].mean()
+
+        area = np.abs((x[previous] - next_x) * (y[start:end] - y[previous])
+                      - (x[previous] - x[start:end]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(area))
+        kept[i + 1] = previous
+    return kept
+
+
+_lttb_loop = lazy_njit(_lttb_loop)
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Indices of the points kept by LTTB downsampling
+
+    Preserves the visual shape of a line (peaks, troughs, trends) with only
+    n_out points; JIT-compiled for long series when numba is installed.
+
+    Parameters:
+    x: Sorted x values (numbers or datetime64)
+    y: y values; NaNs are treated as 0 for point selection
+    n_out: Points to keep (including the first and last)
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x)
+    x = x.astype('datetime64[ns]').astype(np.int64) if np.issubdtype(x.dtype, np.datetime64) else x
+    return _lttb_loop(np.asarray(x, dtype=np.float64),
+                      np.nan_to_num(np.asarray(y, dtype=np.float64)), n_out)
+
+
+def minmax_indices(y, n_buckets):
+    """
+    Indices of the minimum and maximum of each of n_buckets equal buckets
+
+    Keeps every extreme (e.g. the deepest drawdown) exactly; returns at most
+    2 * n_buckets + 2 sorted indices.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if 2 * n_buckets >= n or n_buckets < 1:
+        return np.arange(n)
+    size = -(-n // n_buckets)
+    padded = np.full(size * n_buckets, np.nan)
+    padded[:n] = y
+    blocks = padded.reshape(n_buckets, size)
+    valid = ~np.isnan(blocks).all(axis=1)
+    offsets = np.arange(n_buckets)[valid] * size
+    blocks = blocks[valid]
+    low = np.argmin(np.where(np.isnan(blocks), np.inf, blocks), axis=1)
+    high = np.argmax(np.where(np.isnan(blocks), -np.inf, blocks), axis=1)
+    return np.unique(np.concatenate(([0, n - 1], offsets + low, offsets + high)))
+
+
+def downsample(x, y, max_points, method='lttb'):
+    """
+    Reduce a series to about max_points points for plotting
+
+    Parameters:
+    x: Index or x values
+    y: Values
+    max_points: Target number of points (roughly the plot's pixel width)
+    method: 'lttb' (shape-preserving) or 'minmax' (keeps every extreme)
+
+    Returns (x, y) subsets
+    """
+    x, y = np.asarray(x), np.asarray(y)
+    if max_points is None or len(y) <= max_points:
+        return x, y
+    if method == 'lttb':
+        kept = lttb_indices(x, y, max_points)
+    elif method == 'minmax':
+        kept = minmax_indices(y, max_points // 2)
+    else:
+        raise ValueError("method must be 'lttb' or 'minmax'")
+    return x[kept], y[kept]
+
+
+def _thin(index, values, max_markers):
+    """Evenly spaced subset of trade markers when there are too many to read"""
+    if max_markers is None or len(index) <= max_markers:
+        return index, values
+    kept = np.linspace(0, len(index) - 1, max_markers).astype(np.int64)
+    return index[kept], values[kept]
+
+
+def draw_report(fig, data, symbol, initial_capital=10000, max_points=None, max_markers=None):
+    """
+    Draw the price / portfolio / drawdown report of a backtest onto a figure
+
+    Parameters:
+    fig: matplotlib Figure (pyplot or headless)
+    data: Backtester.data after a strategy and calculate_returns/execute
+    symbol: Title prefix
+    initial_capital: Starting capital for the buy & hold comparison
+    max_points: Points per line after downsampling (None = every bar)
+    max_markers: Maximum buy and sell markers each (None = all)
+    """
+    ax1, ax2, ax3 = fig.subplots(3, 1)
+    index = data.index.to_numpy()
+
+    def line(ax, column_values, method='lttb', **kwargs):
+        x, y = downsample(index, column_values, max_points, method)
+        return ax.plot(x, y, **kwargs)
+
+    # Plot 1: Price and Moving Averages
+    line(ax1, data['Close'].to_numpy(), label='Close Price', linewidth=1)
+    if 'SMA_short' in data.columns:
+        line(ax1, data['SMA_short'].to_numpy(), label='Short MA', alpha=0.7)
+        line(ax1, data['SMA_long'].to_numpy(), label='Long MA', alpha=0.7)
+
+    # Mark buy/sell signals
+    if 'Position' in data.columns:
+        position = data['Position'].to_numpy()
+        close = data['Close'].to_numpy()
+        for side, color, marker, label in ((1, 'green', '^', 'Buy Signal'), (-1, 'red', 'v', 'Sell Signal')):
+            x, y = _thin(index[position == side], close[position == side], max_markers)
+            ax1.scatter(x, y, color=color, marker=marker, s=100, label=label)
+
+    ax1.set_title(f'{symbol} - Price and Signals')
+    ax1.legend()
+    ax1.grid(True, alpha=0.3)
+
+    # Plot 2: Portfolio Value vs Buy & Hold
+    if 'Portfolio_Value' in data.columns:
+        line(ax2, data['Portfolio_Value'].to_numpy(), label='Strategy Portfolio', linewidth=2)
+        buy_hold_value = initial_capital * data['Cumulative_Returns'].to_numpy()
+        line(ax2, buy_hold_value, label='Buy & Hold', linewidth=2, alpha=0.7)
+
+        ax2.set_title('Portfolio Value Comparison')
+        ax2.set_ylabel('Portfolio Value ($)')
+        ax2.legend()
+        ax2.grid(True, alpha=0.3)
+
+    # Plot 3: Drawdown, min/max downsampled so the deepest point is never dropped
+    if 'Cumulative_Strategy_Returns' in data.columns:
+        strategy_drawdown = drawdown(data['Cumulative_Strategy_Returns'].fillna(1).to_numpy())
+        x, y = downsample(index, strategy_drawdown, max_points, 'minmax')
+        ax3.fill_between(x, y, alpha=0.3, color='red')
+        ax3.plot(x, y, color='red', linewidth=1)
+        ax3.set_title('Strategy Drawdown')
+        ax3.set_ylabel('Drawdown (%)')
+        ax3.set_xlabel('Date')
+        ax3.grid(True, alpha=0.3)
+
+    fig.tight_layout()
+    return fig
+
+
+def render_report(data, path, symbol='', initial_capital=10000, max_points=2000, max_markers=200,
+                  figsize=(12, 10), dpi=100):
+    """
+    Render a backtest report straight to a PNG/SVG file without a display
+
+    Uses a standalone matplotlib Figure with the Agg canvas, so it works on
+    servers and in worker processes and leaves no pyplot state behind.
+
+    Parameters:
+    data: Backtester.data after a strategy and calculate_returns/execute
+    path: Output file; the format follows the suffix (.png, .svg, .pdf)
+    max_points: Points per line (defaults to about the pixel width)
+
+    Returns the output path
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    draw_report(fig, data, symbol, initial_capital, max_points, max_markers)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fig.savefig(path)
+    return path
+
+
+def _render_task(task):
+    symbol, data, path, kwargs = task
+    return render_report(data, path, symbol, **kwargs)
+
+
+def render_many(frames, output_dir, fmt='png', processes=None, **kwargs):
+    """
+    Render one report per symbol in parallel worker processes
+
+    Parameters:
+    frames: Dict of symbol -> Backtester.data
+    output_dir: Directory for the files (<symbol>.<fmt>)
+    fmt: 'png' or 'svg'
+    processes: Worker processes (None = CPU count, 1 = render in-process)
+    kwargs: Passed to render_report (initial_capital, max_points, ...)
+
+    Returns a dict of symbol -> output path
+    """
+    output_dir = Path(output_dir)
+    tasks = []
+    for symbol, data in frames.items():
+        columns = [col for col in REPORT_COLUMNS if col in data.columns]
+        path = output_dir / f"{symbol.replace('/', '_')}.{fmt}"
+        tasks.append((symbol, data[columns], path, kwargs))
+    if processes == 1 or len(tasks) <= 1:
+        paths = list(map(_render_task, tasks))
+    else:
+        processes = min(processes or os.cpu_count() or 1, len(tasks))
+        with ProcessPoolExecutor(processes) as pool:
+            paths = list(pool.map(_render_task, tasks))
+    return dict(zip(frames, paths))
@@ -0,0 +1,191 @@
+import functools
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from sweep import SWEEP_COLUMNS, pair_metrics, window_pairs
+
+DEFAULT_CACHE_DIR = Path(os.environ.get('PY_LAB_CACHE_DIR', Path.home() / '.cache' / 'py-lab')) / 'results'
+
+# Modules whose source decides a backtest's result; editing any of them
+# changes the code version and so invalidates every cached result
+CODE_MODULES = ('main_claude', 'strategies', 'indicators', 'sweep', 'metrics', 'jit', 'execution', 'timeframes')
+
+
+@functools.lru_cache(maxsize=None)
+def code_version(modules=CODE_MODULES):
+    """Hash of the source files of `modules` (read once per process)"""
+    digest = hashlib.sha256()
+    for module in modules:
+        digest.update(module.encode())
+        digest.update((Path(__file__).parent / f"{module}.py").read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def _json_value(value):
+    """JSON fallback for NumPy scalars and timestamps in metrics"""
+    return value.item() if isinstance(value, np.generic) else str(value)
+
+
+class ResultCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=256 * 2 ** 20):
+        """
+        Content-addressed on-disk cache of backtest results
+
+        Entries are keyed by a hash of the run parameters, the code version
+        (CODE_MODULES sources) and the input data's content hash
+        (indicators.data_fingerprint), so a key can never return a stale
+        result: changing any of them gives a new key. Each entry is one .npz
+        file holding arrays (e.g. the equity curve) and the metrics as JSON.
+        The least recently used entries are deleted once the cache grows
+        beyond max_bytes.
+
+        Parameters:
+        cache_dir: Directory for the entries
+        max_bytes: Size limit of all entries together
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = None
+
+    def _index(self):
+        """Entry sizes in least-recently-used order, read from disk on first use"""
+        if self._entries is None:
+            files = sorted(self.cache_dir.glob('*.npz'), key=lambda path: path.stat().st_mtime) \
+                if self.cache_dir.exists() else []
+            self._entries = OrderedDict((path.stem, path.stat().st_size) for path in files)
+        return self._entries
+
+    def _path(self, key):
+        return self.cache_dir / f"{key}.npz"
+
+    @staticmethod
+    def key(**parts):
+        """
+        Cache key for a run: sha256 of its parameters and the code version
+
+        Parameters:
+        parts: JSON-serializable parameters, including the data digest
+        """
+        payload = json.dumps({'code': code_version(), **parts}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key):
+        """
+        Return the stored entry as a dict ('metrics' plus the stored arrays), or None
+        """
+        entries = self._index()
+        try:
+            with np.load(self._path(key)) as stored:
+                entry = {name: stored[name] for name in stored.files if name != 'metrics'}
+                entry['metrics'] = json.loads(str(stored['metrics']))
+        except (FileNotFoundError, OSError, ValueError, KeyError):
+            entries.pop(key, None)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        # The file's mtime is the recency other processes see
+        path = self._path(key)
+        os.utime(path)
+        entries[key] = path.stat().st_size
+        entries.move_to_end(key)
+        return entry
+
+    def put(self, key, metrics=None, **arrays):
+        """
+        Store metrics (JSON-serializable dict) and named arrays under key
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp = path.with_name(path.name + '.tmp')
+        with open(tmp, 'wb') as f:
+            np.savez(f, metrics=np.array(json.dumps(metrics or {}, default=_json_value)), **arrays)
+        os.replace(tmp, path)
+
+        entries = self._index()
+        entries[key] = path.stat().st_size
+        entries.move_to_end(key)
+        self._evict()
+
+    def _evict(self):
+        entries = self._entries
+        total = sum(entries.values())
+        while total > self.max_bytes and len(entries) > 1:
+            key, size = entries.popitem(last=False)
+            total -= size
+            try:
+                self._path(key).unlink()
+            except FileNotFoundError:
+                pass
+
+    def clear(self):
+        for key in self._index():
+            try:
+                self._path(key).unlink()
+            except FileNotFoundError:
+                pass
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        entries = self._index()
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(entries),
+            'bytes': sum(entries.values()),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+def cached_sma_sweep(cache, close, short_windows, long_windows, initial_capital=10000,
+                     periods_per_year=252, risk_free_rate=0.02, digest=None):
+    """
+    sma_crossover_sweep that only computes window pairs not seen before
+
+    All pairs evaluated on the same data, capital and annualization share one
+    cache entry holding a metrics table; a new sweep reads it, computes only
+    the missing pairs in one vectorized pass and stores the merged table.
+
+    Parameters:
+    cache: ResultCache
+    close: 1-D array or Series of closing prices
+    digest: Precomputed content hash of the data (defaults to hashing close)
+
+    Returns the same DataFrame as sma_crossover_sweep
+    """
+    close = np.asarray(close, dtype=np.float64)
+    digest = digest or hashlib.sha256(np.ascontiguousarray(close).tobytes()).hexdigest()
+    key = cache.key(kind='sma_sweep', data=digest, initial_capital=initial_capital,
+                    periods_per_year=periods_per_year, risk_free_rate=risk_free_rate)
+
+    shorts, longs = window_pairs(short_windows, long_windows)
+    entry = cache.get(key)
+    known = pd.DataFrame(columns=SWEEP_COLUMNS) if entry is None else \
+        pd.DataFrame({col: entry[col] for col in SWEEP_COLUMNS})
+
+    wanted = pd.MultiIndex.from_arrays([shorts, longs])
+    have = pd.MultiIndex.from_arrays([known['short_window'].to_numpy(dtype=np.int64),
+                                      known['long_window'].to_numpy(dtype=np.int64)])
+    missing = ~wanted.isin(have)
+    if missing.any():
+        computed = pair_metrics(close, shorts[missing], longs[missing], initial_capital,
+                                periods_per_year, risk_free_rate)
+        known = pd.concat([known, computed], ignore_index=True) if len(known) else computed
+        known = known.astype({'short_window': np.int64, 'long_window': np.int64, 'total_trades': np.int64})
+        cache.put(key, {'pairs': len(known)}, **{col: known[col].to_numpy() for col in SWEEP_COLUMNS})
+        have = pd.MultiIndex.from_arrays([known['short_window'].to_numpy(dtype=np.int64),
+                                          known['long_window'].to_numpy(dtype=np.int64)])
+
+    results = known.iloc[have.get_indexer(wanted)]
+    return results.sort_values('sharpe_ratio', ascending=False, ignore_index=True)
@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+
+from sweep import returns_matrix_metrics
+
+METHODS = ('stationary', 'block', 'shuffle')
+
+# Peak bytes per path element: the gathered returns plus the float64
+# temporaries of returns_matrix_metrics (index generation peaks lower)
+_BYTES_PER_ELEMENT = 8 * 8
+
+
+def bootstrap_indices(n_bars, n_paths, method='stationary', block_size=20, rng=None):
+    """
+    Resampling indices for many paths at once, shape (n_paths, n_bars)
+
+    Parameters:
+    n_bars: Length of the original return series
+    n_paths: Number of resampled paths
+    method: 'stationary' (Politis-Romano, geometric block lengths with mean
+            block_size), 'block' (circular blocks of exactly block_size) or
+            'shuffle' (independent permutation of every bar)
+    block_size: Mean or fixed block length; keeps short-range autocorrelation
+    rng: numpy Generator
+    """
+    rng = rng or np.random.default_rng()
+    positions = np.arange(n_bars)
+
+    if method == 'shuffle':
+        return rng.permuted(np.broadcast_to(positions, (n_paths, n_bars)), axis=1)
+
+    if method == 'block':
+        n_blocks = -(-n_bars // block_size)
+        starts = rng.integers(0, n_bars, (n_paths, n_blocks))
+        indices = (starts[:, :, None] + np.arange(block_size)) % n_bars
+        return indices.reshape(n_paths, -1)[:, :n_bars]
+
+    if method == 'stationary':
+        # A new block starts with probability 1 / block_size; inside a block the
+        # index advances by one from the block's random start (wrapping around)
+        new_block = rng.random((n_paths, n_bars)) < 1.0 / block_size
+        new_block[:, 0] = True
+        block_start = np.maximum.accumulate(np.where(new_block, positions, 0), axis=1)
+        start_index = rng.integers(0, n_bars, (n_paths, n_bars))
+        start_index = np.take_along_axis(start_index, block_start, axis=1)
+        return (start_index + positions - block_start) % n_bars
+
+    raise ValueError(f"method must be one of {METHODS}")
+
+
+def resample_paths(returns, n_paths, method='stationary', block_size=20, seed=None):
+    """Resampled return paths as one (n_paths, n_bars) array"""
+    returns = np.asarray(returns, dtype=np.float64)
+    indices = bootstrap_indices(len(returns), n_paths, method, block_size, np.random.default_rng(seed))
+    return returns[indices]
+
+
+def robustness_test(strategy_returns, n_paths=10000, method='stationary', block_size=20,
+                    initial_capital=10000, periods_per_year=252, risk_free_rate=0.02,
+                    seed=None, max_memory_mb=256):
+    """
+    Distribution of Sharpe ratio, drawdown and final value over resampled paths
+
+    Paths are generated and evaluated in chunks sized so that the working set
+    stays under max_memory_mb; each chunk is one 2-D array scored by
+    returns_matrix_metrics, so there is no Python loop per path.
+
+    Note that shuffling keeps the multiset of returns, so it leaves total
+    return and Sharpe unchanged and only tests path-dependent metrics such as
+    drawdown; the bootstrap methods vary all of them.
+
+    Parameters:
+    strategy_returns: Per-bar strategy returns (NaNs are dropped)
+    n_paths: Paths to simulate (100k is fine with the default memory cap)
+    method: 'stationary', 'block' or 'shuffle' (see bootstrap_indices)
+    block_size: Mean or fixed block length in bars
+    seed: Random seed for reproducible results
+    max_memory_mb: Approximate memory budget for one chunk
+
+    Returns a dict with 'paths' (metrics per path), 'actual' (metrics of the
+    historical path), 'summary' (percentiles) and 'probabilities'
+    """
+    returns = np.asarray(strategy_returns, dtype=np.float64)
+    returns = returns[~np.isnan(returns)]
+    n_bars = len(returns)
+    if n_bars < 2:
+        raise ValueError("Need at least two returns to resample")
+
+    rng = np.random.default_rng(seed)
+    chunk = max(1, int(max_memory_mb * 2 ** 20 // (n_bars * _BYTES_PER_ELEMENT)))
+    results = {}
+    for start in range(0, n_paths, chunk):
+        size = min(chunk, n_paths - start)
+        paths = returns[bootstrap_indices(n_bars, size, method, block_size, rng)]
+        for name, values in returns_matrix_metrics(paths, periods_per_year, risk_free_rate).items():
+            results.setdefault(name, []).append(values)
+        del paths
+
+    metrics = pd.DataFrame({name: np.concatenate(values) for name, values in results.items()})
+    metrics['final_value'] = initial_capital * (1 + metrics['total_return'])
+    actual = {name: float(values[0]) for name, values in
+              returns_matrix_metrics(returns, periods_per_year, risk_free_rate).items()}
+    actual['final_value'] = initial_capital * (1 + actual['total_return'])
+
+    summary = metrics.quantile([0.05, 0.25, 0.5, 0.75, 0.95]).T
+    summary.columns = ['p5', 'p25', 'median', 'p75', 'p95']
+    summary['actual'] = pd.Series(actual)
+    summary['actual_percentile'] = [(metrics[name] <= actual[name]).mean() * 100 for name in summary.index]
+
+    probabilities = {
+        'loss': float((metrics['total_return'] < 0).mean()),
+        'sharpe_below_zero': float((metrics['sharpe_ratio'] < 0).mean()),
+        'drawdown_worse_than_actual': float((metrics['max_drawdown'] < actual['max_drawdown']).mean()),
+    }
+    return {'paths': metrics, 'actual': actual, 'summary': summary, 'probabilities': probabilities}
@@ -0,0 +1,326 @@
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from data_cache import OHLCVCache
+from price_store import UniverseStore
+from sweep import crossover_signals, rolling_means
+
+EVENT_COLUMNS = ['Date', 'Symbol', 'Event', 'Close', 'SMA_short', 'SMA_long', 'Return']
+
+# Exchange-local time after which today's daily bar is final (NSE cash market)
+SESSION_CLOSE = '15:30'
+
+
+def completed_closes(symbols, start_date, end_date=None, cache=None, session_close=SESSION_CLOSE):
+    """
+    Daily closes per symbol from the OHLCV cache, without a still-forming bar
+
+    The scanner never revisits a date it has ingested, so with no end_date a
+    bar dated today (in the exchange's time zone) is only kept once the clock
+    there has passed session_close.
+
+    Parameters:
+    end_date: Exclusive end; an explicit date is taken as is
+    session_close: Exchange-local closing time, e.g. '15:30' (None = keep today's bar)
+
+    Returns a dict of symbol -> close Series with a tz-naive index
+    """
+    cache = cache or OHLCVCache()
+    closes = {}
+    for symbol in symbols:
+        try:
+            data = cache.get(symbol, start_date, end_date)
+        except Exception as e:
+            print(f"Error fetching data for {symbol}: {e}")
+            continue
+        close = data['Close']
+        if end_date is None and session_close is not None and len(close):
+            now = pd.Timestamp.now(tz=close.index.tz)
+            if now.time() < pd.Timestamp(session_close).time():
+                close = close[close.index < now.normalize()]
+        if len(close):
+            closes[symbol] = close.tz_localize(None)
+    return closes
+
+
+class UniverseScanner:
+    def __init__(self, symbols, short_window=50, long_window=200, move_threshold=0.05):
+        """
+        Daily SMA crossover / threshold scanner over a whole universe
+
+        Holds the rolling state of StreamingSMACrossover for every symbol as
+        one set of arrays (ring buffer of recent closes, window sums, last
+        signal), so ingesting a day's bars costs O(symbols) NumPy work and no
+        history is refetched. Signals follow Backtester.moving_average_strategy.
+
+        Events reported per symbol and day:
+        - 'Golden Cross' / 'Death Cross': the crossover signal turns on / off
+        - 'Above Long SMA' / 'Below Long SMA': the close crosses the long SMA
+        - 'Big Move': the absolute daily return reaches move_threshold
+
+        Parameters:
+        symbols: Symbols of the universe (one state row each)
+        short_window: Period for short-term moving average
+        long_window: Period for long-term moving average
+        move_threshold: Daily return size reported as 'Big Move' (None = off)
+        """
+        self.symbols = np.asarray(symbols, dtype=str)
+        self.short_window = short_window
+        self.long_window = long_window
+        self.move_threshold = move_threshold
+        self.last_date = None
+
+        n = len(self.symbols)
+        self._size = max(short_window, long_window)
+        self._buffer = np.zeros((n, self._size))
+        self._head = np.zeros(n, dtype=np.int64)
+        self._short_sum = np.zeros(n)
+        self._long_sum = np.zeros(n)
+        self.bars = np.zeros(n, dtype=np.int64)
+        self.last_close = np.full(n, np.nan)
+        self.signal = np.zeros(n, dtype=np.int8)
+        self.above_long = np.zeros(n, dtype=np.int8)
+
+    def _window_sum(self, rows, window):
+        """Exact sum of the last `window` closes of the given symbols"""
+        positions = (self._head[rows, None] - np.arange(1, window + 1)) % self._size
+        recent = np.take_along_axis(self._buffer[rows], positions, axis=1)
+        filled = np.arange(window) < np.minimum(self.bars[rows], window)[:, None]
+        return np.where(filled, recent, 0.0).sum(axis=1)
+
+    @property
+    def sma_short(self):
+        with np.errstate(invalid='ignore'):
+            return np.where(self.bars >= self.short_window, self._short_sum / self.short_window, np.nan)
+
+    @property
+    def sma_long(self):
+        with np.errstate(invalid='ignore'):
+            return np.where(self.bars >= self.long_window, self._long_sum / self.long_window, np.nan)
+
+    def ingest(self, date, closes):
+        """
+        Feed one day's closes and return the symbols with fresh events
+
+        Parameters:
+        date: Date of the bar; must be later than the last ingested date
+        closes: Mapping/Series of symbol -> close, or an array aligned with
+                self.symbols; missing symbols and NaNs keep their state
+
+        Returns a DataFrame with EVENT_COLUMNS, one row per event
+        """
+        date = pd.Timestamp(date)
+        if self.last_date is not None and date <= self.last_date:
+            print(f"Skipping {date.date()}: state is already at {self.last_date.date()}")
+            return pd.DataFrame(columns=EVENT_COLUMNS)
+
+        if isinstance(closes, (dict, pd.Series)):
+            closes = pd.Series(closes, dtype=np.float64).reindex(self.symbols).to_numpy()
+        closes = np.asarray(closes, dtype=np.float64)
+        rows = np.flatnonzero(~np.isnan(closes))
+        close = closes[rows]
+        bars = self.bars[rows]
+
+        # Roll the window sums forward for the symbols that have a bar today
+        head = self._head[rows]
+        drop_short = bars >= self.short_window
+        drop_long = bars >= self.long_window
+        self._short_sum[rows] -= np.where(drop_short, self._buffer[rows, (head - self.short_window) % self._size], 0.0)
+        self._long_sum[rows] -= np.where(drop_long, self._buffer[rows, (head - self.long_window) % self._size], 0.0)
+        self._buffer[rows, head] = close
+        self._head[rows] = (head + 1) % self._size
+        self._short_sum[rows] += close
+        self._long_sum[rows] += close
+        self.bars[rows] = bars = bars + 1
+
+        # Each symbol's sums are recomputed once per buffer length to stop drift
+        resync = rows[bars % self._size == 0]
+        if len(resync):
+            self._short_sum[resync] = self._window_sum(resync, self.short_window)
+            self._long_sum[resync] = self._window_sum(resync, self.long_window)
+
+        sma_short, sma_long = self.sma_short[rows], self.sma_long[rows]
+        previous_signal = self.signal[rows]
+        signal = ((bars > self.short_window) & (sma_short > sma_long)).astype(np.int8)
+        previous_above = self.above_long[rows]
+        above = (close > sma_long).astype(np.int8)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            returns = close / self.last_close[rows] - 1
+
+        self.signal[rows] = signal
+        self.above_long[rows] = above
+        self.last_close[rows] = close
+        self.last_date = date
+
+        # Position changes need a previous bar; the long SMA must exist to be crossed
+        has_previous = bars > 1
+        has_long = bars > self.long_window
+        events = [
+            ('Golden Cross', has_previous & (signal > previous_signal)),
+            ('Death Cross', has_previous & (signal < previous_signal)),
+            ('Above Long SMA', has_long & (above > previous_above)),
+            ('Below Long SMA', has_long & (above < previous_above)),
+        ]
+        if self.move_threshold is not None:
+            events.append(('Big Move', np.abs(np.nan_to_num(returns)) >= self.move_threshold))
+
+        frames = []
+        for name, mask in events:
+            hit = np.flatnonzero(mask)
+            if len(hit):
+                frames.append(pd.DataFrame({
+                    'Date': date, 'Symbol': self.symbols[rows[hit]], 'Event': name, 'Close': close[hit],
+                    'SMA_short': sma_short[hit], 'SMA_long': sma_long[hit], 'Return': returns[hit],
+                }))
+        if not frames:
+            return pd.DataFrame(columns=EVENT_COLUMNS)
+        return pd.concat(frames, ignore_index=True)
+
+    def ingest_prices(self, index, prices):
+        """
+        Ingest a (symbols x dates) price block day by day
+
+        Parameters:
+        index: Dates of the columns
+        prices: 2-D array aligned with self.symbols, NaN where a symbol has no bar
+
+        Returns all events, in date order
+        """
+        frames = [self.ingest(date, prices[:, col]) for col, date in enumerate(index)
+                  if self.last_date is None or pd.Timestamp(date) > self.last_date]
+        frames = [frame for frame in frames if len(frame)]
+        if not frames:
+            return pd.DataFrame(columns=EVENT_COLUMNS)
+        return pd.concat(frames, ignore_index=True)
+
+    @classmethod
+    def from_history(cls, symbols, index, prices, short_window=50, long_window=200, move_threshold=0.05):
+        """
+        Build the state from a price history block in one pass per symbol
+
+        Uses the batch rolling_means / crossover_signals so the resulting state
+        matches replaying every bar through ingest.
+
+        Parameters:
+        symbols: Symbol per row of prices
+        index: Dates of the columns
+        prices: 2-D array, NaN where a symbol has no bar (e.g. load_universe output)
+        """
+        scanner = cls(symbols, short_window, long_window, move_threshold)
+        size = scanner._size
+        windows = np.array([short_window, long_window])
+        for row, values in enumerate(np.asarray(prices, dtype=np.float64)):
+            close = values[~np.isnan(values)]
+            n = len(close)
+            if n == 0:
+                continue
+            means = rolling_means(close, windows)
+            recent = close[-size:]
+            scanner._buffer[row, :len(recent)] = recent
+            scanner._head[row] = len(recent) % size
+            scanner._short_sum[row] = close[-short_window:].sum()
+            scanner._long_sum[row] = close[-long_window:].sum()
+            scanner.bars[row] = n
+            scanner.last_close[row] = close[-1]
+            scanner.signal[row] = crossover_signals(close, windows[:1], windows[1:], means)[0, -1]
+            scanner.above_long[row] = close[-1] > means[long_window][-1]
+        if len(index):
+            scanner.last_date = pd.Timestamp(index[-1])
+        return scanner
+
+    @classmethod
+    def from_universe(cls, symbols, start_date, end_date=None, short_window=50, long_window=200,
+                      move_threshold=0.05, cache=None, session_close=SESSION_CLOSE):
+        """
+        Bootstrap a scanner from cached daily history (see completed_closes)
+
+        Parameters:
+        start_date: First date of history; needs at least long_window bars before today
+        """
+        store = UniverseStore.from_series(completed_closes(symbols, start_date, end_date, cache, session_close),
+                                          np.float64)
+        return cls.from_history(store.symbols, store.index, store.prices, short_window, long_window,
+                                move_threshold)
+
+    def update(self, cache=None, end_date=None, session_close=SESSION_CLOSE):
+        """
+        Ingest every completed bar newer than last_date from the OHLCV cache
+
+        Only the missing days are requested per symbol, so a daily run downloads
+        one bar each. Without end_date, today's bar is left for the next run
+        until the exchange has closed (see completed_closes). Returns the
+        events of all ingested days.
+        """
+        if self.last_date is None:
+            print("Scanner has no history. Build it with from_universe first.")
+            return pd.DataFrame(columns=EVENT_COLUMNS)
+
+        start = self.last_date + pd.Timedelta(days=1)
+        closes = completed_closes(self.symbols, start, end_date, cache, session_close)
+        if not closes:
+            return pd.DataFrame(columns=EVENT_COLUMNS)
+
+        store = UniverseStore.from_series(closes, np.float64)
+        prices = pd.DataFrame(store.prices, index=store.symbols).reindex(self.symbols).to_numpy()
+        return self.ingest_prices(store.index, prices)
+
+    def state(self):
+        """Current per-symbol state as a DataFrame"""
+        return pd.DataFrame({
+            'Bars': self.bars,
+            'Close': self.last_close,
+            'SMA_short': self.sma_short,
+            'SMA_long': self.sma_long,
+            'Signal': self.signal,
+        }, index=pd.Index(self.symbols, name='Symbol'))
+
+    def save(self, path):
+        """Write the state to one .npz file (atomically)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + '.tmp')
+        with open(tmp, 'wb') as f:
+            np.savez(f, symbols=self.symbols,
+                     params=np.array([self.short_window, self.long_window]),
+                     move_threshold=np.array(np.nan if self.move_threshold is None else self.move_threshold),
+                     last_date=np.array(str(self.last_date.date()) if self.last_date is not None else ''),
+                     buffer=self._buffer, head=self._head, short_sum=self._short_sum, long_sum=self._long_sum,
+                     bars=self.bars, last_close=self.last_close, signal=self.signal, above_long=self.above_long)
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        """Restore a scanner written by save"""
+        with np.load(path) as state:
+            short_window, long_window = (int(value) for value in state['params'])
+            move_threshold = float(state['move_threshold'])
+            scanner = cls(state['symbols'], short_window, long_window,
+                          None if np.isnan(move_threshold) else move_threshold)
+            last_date = str(state['last_date'])
+            scanner.last_date = pd.Timestamp(last_date) if last_date else None
+            scanner._buffer = state['buffer'].copy()
+            scanner._head = state['head'].copy()
+            scanner._short_sum = state['short_sum'].copy()
+            scanner._long_sum = state['long_sum'].copy()
+            scanner.bars = state['bars'].copy()
+            scanner.last_close = state['last_close'].copy()
+            scanner.signal = state['signal'].copy()
+            scanner.above_long = state['above_long'].copy()
+        return scanner
+
+
+if __name__ == "__main__":
+    nifty_sample = ['RELIANCE.NS', 'TCS.NS', 'HDFCBANK.NS', 'INFY.NS', 'ICICIBANK.NS',
+                    'HINDUNILVR.NS', 'ITC.NS', 'SBIN.NS', 'BHARTIARTL.NS', 'LT.NS']
+    state_path = Path('scanner_state.npz')
+    if state_path.exists():
+        scanner = UniverseScanner.load(state_path)
+        print(scanner.update().to_string(index=False))
+    else:
+        scanner = UniverseScanner.from_universe(nifty_sample, pd.Timestamp.today() - pd.DateOffset(years=2))
+        print(scanner.state())
+    scanner.save(state_path)
@@ -0,0 +1,53 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class SharedArray:
+    def __init__(self, shm, shape, dtype, owner=False):
+        """
+        NumPy array living in a named shared-memory block
+
+        Create it in the parent with SharedArray.create(array), hand `spec` to
+        worker processes and re-open it there with SharedArray.attach(spec).
+        Only the owner unlinks the block.
+        """
+        self.shm = shm
+        self.owner = owner
+        self.array = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+    @classmethod
+    def create(cls, array=None, shape=None, dtype=np.float64, fill=None):
+        """Allocate a block, either copying `array` or of the given shape (optionally filled)"""
+        if array is not None:
+            array = np.asarray(array)
+            shape, dtype = array.shape, array.dtype
+        nbytes = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+        shared = cls(shared_memory.SharedMemory(create=True, size=nbytes), shape, dtype, owner=True)
+        if array is not None:
+            shared.array[:] = array
+        elif fill is not None:
+            shared.array.fill(fill)
+        return shared
+
+    @classmethod
+    def attach(cls, spec):
+        name, shape, dtype = spec
+        return cls(shared_memory.SharedMemory(name=name), shape, dtype)
+
+    @property
+    def spec(self):
+        return (self.shm.name, self.array.shape, self.array.dtype.str)
+
+    def close(self):
+        # Drop the view first, the buffer cannot be released while it is exported
+        self.array = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
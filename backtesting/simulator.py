@@ -0,0 +1,94 @@
+import numpy as np
+
+from jit import lazy_njit
+
+
+def _fill_trades(prices, sides, initial_cash, fee_rate, slippage, lot_size):
+    """
+    Walk the trade events only and return cash/position after each of them
+
+    Parameters:
+    prices: Close prices on the trade bars
+    sides: 1 for buy, -1 for sell
+    """
+    n = len(prices)
+    cash_after = np.empty(n)
+    position_after = np.empty(n)
+    cash = initial_cash
+    position = 0.0
+
+    for i in range(n):
+        price = prices[i]
+
+        # Buy with all available cash, fees included
+        if sides[i] == 1 and cash > 0:
+            fill_price = price * (1.0 + slippage)
+            quantity = cash / (fill_price * (1.0 + fee_rate))
+            if lot_size > 0:
+                quantity = np.floor(quantity / lot_size) * lot_size
+                if quantity > 0:
+                    cost = quantity * fill_price
+                    cash = cash - cost - cost * fee_rate
+                    position = position + quantity
+            else:
+                position = position + quantity
+                cash = 0.0
+
+        # Sell the whole position
+        elif sides[i] == -1 and position > 0:
+            proceeds = position * price * (1.0 - slippage)
+            cash = cash + proceeds - proceeds * fee_rate
+            position = 0.0
+
+        cash_after[i] = cash
+        position_after[i] = position
+
+    return cash_after, position_after
+
+
+_fill_trades = lazy_njit(_fill_trades)
+
+
+def simulate_portfolio(prices, position_changes, initial_cash=10000, fee_rate=0.0,
+                       slippage=0.0, lot_size=None):
+    """
+    Simulate an all-in long-only cash/position account on NumPy arrays
+
+    Only bars with a trade are visited in a loop (JIT-compiled for series of
+    JIT_MIN_SIZE bars or more when numba is installed, plain Python otherwise);
+    the portfolio value of every other bar is filled in vectorized.
+
+    Parameters:
+    prices: 1-D array of prices used for fills and valuation
+    position_changes: 1-D array, 1 = buy with all cash, -1 = sell everything,
+                      any other value = hold
+    initial_cash: Starting cash
+    fee_rate: Brokerage/charges as a fraction of traded value (e.g. 0.001)
+    slippage: Adverse price move per fill as a fraction (e.g. 0.0005)
+    lot_size: Trade in multiples of this quantity (None = fractional shares)
+
+    Returns a dict of 1-D arrays: portfolio, cash, position
+    """
+    prices = np.ascontiguousarray(prices, dtype=np.float64)
+    position_changes = np.asarray(position_changes, dtype=np.float64)
+    if prices.shape != position_changes.shape:
+        raise ValueError("prices and position_changes must have the same length")
+
+    sides = np.where(position_changes == 1.0, 1, np.where(position_changes == -1.0, -1, 0))
+    trade_bars = np.flatnonzero(sides)
+
+    cash_after, position_after = _fill_trades(
+        prices[trade_bars], sides[trade_bars].astype(np.int64), float(initial_cash),
+        float(fee_rate), float(slippage), float(lot_size or 0), bars=len(prices)
+    )
+
+    # Carry the state of the latest trade forward to every bar
+    last_trade = np.searchsorted(trade_bars, np.arange(len(prices)), side='right') - 1
+    cash = np.concatenate([[float(initial_cash)], cash_after])[last_trade + 1]
+    position = np.concatenate([[0.0], position_after])[last_trade + 1]
+
+    return {
+        'portfolio': cash + position * prices,
+        'cash': cash,
+        'position': position,
+    }
@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+
+from indicators import INDICATORS, data_fingerprint
+from instrumentation import NULL_PROFILER
+from timeframes import align_to, default_timeframes
+
+
+class Indicators:
+    def __init__(self, cache, symbol, data, profiler=NULL_PROFILER):
+        """
+        Indicator accessor handed to strategies, backed by a shared IndicatorCache
+
+        Parameters:
+        cache: IndicatorCache shared between strategies
+        symbol: Symbol the data belongs to
+        data: OHLCV DataFrame
+        profiler: Profiler recording indicator computations
+        """
+        self.cache = cache
+        self.symbol = symbol
+        self.data = data
+        self.profiler = profiler
+        # Hashed once here; every indicator lookup on this frame reuses it
+        self.fingerprint = data_fingerprint(data)
+
+    def resample(self, rule):
+        """Indicators for the same symbol on a higher timeframe (resampled once per session)"""
+        frame = default_timeframes.get(self.symbol, self.data, rule, self.fingerprint)
+        return Indicators(self.cache, f"{self.symbol}@{rule}", frame, self.profiler)
+
+    def __getattr__(self, name):
+        # indicators.sma(window=50) -> cache.get(symbol, data, 'sma', window=50)
+        if name not in INDICATORS:
+            raise AttributeError(name)
+        return lambda **params: self.cache.get(self.symbol, self.data, name, self.profiler,
+                                               self.fingerprint, **params)
+
+
+def _hold_between(entries, exits):
+    """Turn entry/exit event masks into a 0/1 signal that is held until the next exit"""
+    events = np.where(entries, 1, np.where(exits, 0, -1))
+    # Forward-fill the latest event, bars before the first event stay flat
+    last_event = np.maximum.accumulate(np.where(events >= 0, np.arange(len(events)), -1))
+    return np.where(last_event >= 0, events[np.maximum(last_event, 0)], 0).astype(np.int8)
+
+
+class Strategy:
+    """
+    Base class for strategies
+
+    Subclasses implement generate_signals(indicators) returning a 0/1 int8
+    array (1 = long) aligned with the price data. All indicators must be read
+    through the `indicators` accessor so they are shared and memoized.
+    """
+    name = 'strategy'
+
+    def generate_signals(self, indicators):
+        raise NotImplementedError
+
+    def __repr__(self):
+        params = ', '.join(f"{k}={v}" for k, v in vars(self).items())
+        return f"{type(self).__name__}({params})"
+
+
+class SMACrossover(Strategy):
+    name = 'sma_crossover'
+
+    def __init__(self, short_window=20, long_window=50):
+        self.short_window = short_window
+        self.long_window = long_window
+
+    def generate_signals(self, indicators):
+        sma_short = indicators.sma(window=self.short_window)
+        sma_long = indicators.sma(window=self.long_window)
+
+        signals = np.zeros(len(sma_short), dtype=np.int8)
+        with np.errstate(invalid='ignore'):
+            signals[self.short_window:] = sma_short[self.short_window:] > sma_long[self.short_window:]
+        return signals
+
+
+class EMACrossover(Strategy):
+    name = 'ema_crossover'
+
+    def __init__(self, fast_span=12, slow_span=26):
+        self.fast_span = fast_span
+        self.slow_span = slow_span
+
+    def generate_signals(self, indicators):
+        fast = indicators.ema(span=self.fast_span)
+        slow = indicators.ema(span=self.slow_span)
+        signals = (fast > slow).astype(np.int8)
+        signals[:self.slow_span] = 0
+        return signals
+
+
+class RSIReversion(Strategy):
+    name = 'rsi_reversion'
+
+    def __init__(self, window=14, oversold=30, overbought=70):
+        self.window = window
+        self.oversold = oversold
+        self.overbought = overbought
+
+    def generate_signals(self, indicators):
+        values = indicators.rsi(window=self.window)
+        with np.errstate(invalid='ignore'):
+            return _hold_between(values < self.oversold, values > self.overbought)
+
+
+class MACDCrossover(Strategy):
+    name = 'macd_crossover'
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast = fast
+        self.slow = slow
+        self.signal = signal
+
+    def generate_signals(self, indicators):
+        macd_line, signal_line, _ = indicators.macd(fast=self.fast, slow=self.slow, signal=self.signal)
+        signals = (macd_line > signal_line).astype(np.int8)
+        signals[:self.slow + self.signal] = 0
+        return signals
+
+
+class BollingerReversion(Strategy):
+    name = 'bollinger_reversion'
+
+    def __init__(self, window=20, num_std=2.0):
+        self.window = window
+        self.num_std = num_std
+
+    def generate_signals(self, indicators):
+        close = indicators.data['Close'].to_numpy()
+        middle, _, lower = indicators.bollinger(window=self.window, num_std=self.num_std)
+        # Buy below the lower band, exit once price recovers to the middle band
+        with np.errstate(invalid='ignore'):
+            return _hold_between(close < lower, close > middle)
+
+
+class MultiTimeframe(Strategy):
+    name = 'multi_timeframe'
+
+    def __init__(self, entry, trend, trend_timeframe='1D'):
+        """
+        Take the entry strategy's signal only while the higher-timeframe trend
+        strategy is long (e.g. 15-minute SMA entries filtered by a daily trend)
+
+        Parameters:
+        entry: Strategy run on the backtest's own bars
+        trend: Strategy run on the resampled bars
+        trend_timeframe: Timeframe of the trend filter (e.g. '1D', '1h')
+        """
+        self.entry = entry
+        self.trend = trend
+        self.trend_timeframe = trend_timeframe
+
+    def generate_signals(self, indicators):
+        higher = indicators.resample(self.trend_timeframe)
+        trend = pd.DataFrame({'Signal': self.trend.generate_signals(higher)}, index=higher.data.index)
+        # Only completed higher-timeframe bars are visible to the entry bars
+        trend = align_to(indicators.data.index, trend, self.trend_timeframe)['Signal']
+        return (self.entry.generate_signals(indicators) * trend.fillna(0).to_numpy()).astype(np.int8)
@@ -0,0 +1,165 @@
+import math
+
+
+class StreamingSMACrossover:
+    def __init__(self, short_window=20, long_window=50, initial_capital=10000,
+                 periods_per_year=252, risk_free_rate=0.02):
+        """
+        Incremental SMA crossover engine for live bar updates
+
+        Keeps O(1) rolling state (window sums, last signal, equity, drawdown
+        high-water mark and return moments) so each new bar is processed in
+        constant time. Signals and returns follow the same rules as
+        Backtester.moving_average_strategy / calculate_returns.
+
+        Parameters:
+        short_window: Period for short-term moving average
+        long_window: Period for long-term moving average
+        initial_capital: Starting capital for trading
+        periods_per_year: Bars per year used for annualization
+        risk_free_rate: Annual risk-free rate used in the Sharpe ratio
+        """
+        self.short_window = short_window
+        self.long_window = long_window
+        self.initial_capital = initial_capital
+        self.periods_per_year = periods_per_year
+        self.risk_free_rate = risk_free_rate
+
+        # Ring buffer holding the last max(short, long) closes
+        self._size = max(short_window, long_window)
+        self._buffer = [0.0] * self._size
+        self._head = 0
+        self._short_sum = 0.0
+        self._long_sum = 0.0
+
+        self.bars = 0
+        self.last_close = None
+        self.signal = 0
+        self.position = 0
+        self.sma_short = math.nan
+        self.sma_long = math.nan
+
+        # Running performance state
+        self.cumulative = 1.0
+        self.market_cumulative = 1.0
+        self.high_water_mark = 1.0
+        self.max_drawdown = 0.0
+        self.trades = 0
+        self._n = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def _resync(self):
+        """Recompute window sums from the buffer to stop floating-point drift"""
+        window = [self._buffer[(self._head - 1 - i) % self._size]
+                  for i in range(min(self.bars, self._size))]
+        self._short_sum = math.fsum(window[:self.short_window])
+        self._long_sum = math.fsum(window[:self.long_window])
+
+    def update(self, close):
+        """
+        Feed one new bar and return the updated bar state
+
+        Parameters:
+        close: Closing price of the new bar
+        """
+        close = float(close)
+
+        # Roll the window sums forward
+        if self.bars >= self.short_window:
+            self._short_sum -= self._buffer[(self._head - self.short_window) % self._size]
+        if self.bars >= self.long_window:
+            self._long_sum -= self._buffer[(self._head - self.long_window) % self._size]
+        self._buffer[self._head] = close
+        self._head = (self._head + 1) % self._size
+        self._short_sum += close
+        self._long_sum += close
+        self.bars += 1
+
+        # A full resync every buffer length keeps the cost amortized O(1)
+        if self.bars % self._size == 0:
+            self._resync()
+
+        self.sma_short = self._short_sum / self.short_window if self.bars >= self.short_window else math.nan
+        self.sma_long = self._long_sum / self.long_window if self.bars >= self.long_window else math.nan
+
+        # Generate signal (bars before the short window stay flat, as in the batch version)
+        previous_signal = self.signal
+        self.signal = int(self.bars > self.short_window and self.sma_short > self.sma_long)
+        position = self.signal - previous_signal if self.bars > 1 else 0
+
+        # Returns use yesterday's signal
+        strategy_return = math.nan
+        if self.last_close is not None:
+            market_return = close / self.last_close - 1
+            strategy_return = market_return * previous_signal
+            self.market_cumulative *= 1 + market_return
+            self.cumulative *= 1 + strategy_return
+            self.high_water_mark = max(self.high_water_mark, self.cumulative)
+            self.max_drawdown = min(self.max_drawdown,
+                                    (self.cumulative - self.high_water_mark) / self.high_water_mark)
+            # A trade counts once its entry bar is held, as in performance_metrics
+            if self.position == 1:
+                self.trades += 1
+
+            # Welford update of the return mean/variance
+            self._n += 1
+            delta = strategy_return - self._mean
+            self._mean += delta / self._n
+            self._m2 += delta * (strategy_return - self._mean)
+        self.last_close = close
+        self.position = position
+
+        return {
+            'Close': close,
+            'SMA_short': self.sma_short,
+            'SMA_long': self.sma_long,
+            'Signal': self.signal,
+            'Position': position,
+            'Strategy_Returns': strategy_return,
+            'Portfolio_Value': self.initial_capital * self.cumulative,
+            'Drawdown': (self.cumulative - self.high_water_mark) / self.high_water_mark,
+        }
+
+    def warm_up(self, closes):
+        """Replay historical closes to build the rolling state, returns self"""
+        for close in closes:
+            self.update(close)
+        return self
+
+    def metrics(self):
+        """Current performance metrics, computed from the running state in O(1)"""
+        if self._n == 0:
+            return {}
+
+        total_return = self.cumulative - 1
+        market_return = self.market_cumulative - 1
+        annualized_return = (1 + total_return) ** (self.periods_per_year / self._n) - 1
+        volatility = math.sqrt(self._m2 / (self._n - 1)) * math.sqrt(self.periods_per_year) if self._n > 1 else 0.0
+        sharpe_ratio = (annualized_return - self.risk_free_rate) / volatility if volatility != 0 else 0.0
+
+        return {
+            'Total Return': total_return,
+            'Market Return': market_return,
+            'Annualized Return': annualized_return,
+            'Volatility': volatility,
+            'Sharpe Ratio': sharpe_ratio,
+            'Maximum Drawdown': self.max_drawdown,
+            'Total Trades': self.trades,
+            'Final Portfolio Value': self.initial_capital * self.cumulative,
+            'Signal': self.signal,
+        }
+
+
+if __name__ == "__main__":
+    # Consistency check: a warmed-up stream reports the batch sweep's metrics
+    from benchmarks import random_walk_ohlcv
+    from sweep import pair_metrics
+
+    close = random_walk_ohlcv(5000, seed=1)['Close'].to_numpy()
+    stream = StreamingSMACrossover(20, 50).warm_up(close).metrics()
+    batch = pair_metrics(close, [20], [50]).iloc[0]
+    print(f"Total Trades: stream {stream['Total Trades']}, sweep {int(batch['total_trades'])}")
+    print(f"Total Return: stream {stream['Total Return']:.6f}, sweep {batch['total_return']:.6f}")
+    if stream['Total Trades'] != batch['total_trades']:
+        raise SystemExit("Streaming and batch trade counts differ")
@@ -0,0 +1,173 @@
+import numpy as np
+import pandas as pd
+
+SWEEP_COLUMNS = ['short_window', 'long_window', 'total_return', 'annualized_return', 'volatility',
+                 'sharpe_ratio', 'max_drawdown', 'total_trades', 'final_value']
+
+
+def rolling_means(close, windows):
+    """
+    Compute simple moving averages for many windows from one cumulative-sum pass
+
+    Parameters:
+    close: 1-D array of closing prices
+    windows: Iterable of window lengths
+
+    Returns a dict mapping window -> 1-D float64 array (NaN until the window is full)
+    """
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    n = len(close)
+
+    # One cumulative sum, every window is then a difference of two slices
+    csum = np.empty(n + 1)
+    csum[0] = 0.0
+    np.cumsum(close, out=csum[1:])
+
+    means = {}
+    for window in np.unique(np.asarray(windows, dtype=np.int64)):
+        window = int(window)
+        sma = np.full(n, np.nan)
+        if 0 < window <= n:
+            sma[window - 1:] = (csum[window:] - csum[:n - window + 1]) / window
+        means[window] = sma
+    return means
+
+
+def window_pairs(short_windows, long_windows):
+    """
+    Build every (short_window, long_window) pair where short < long
+
+    Returns two aligned int64 arrays
+    """
+    short_windows = np.unique(np.asarray(short_windows, dtype=np.int64))
+    long_windows = np.unique(np.asarray(long_windows, dtype=np.int64))
+    shorts, longs = np.meshgrid(short_windows, long_windows, indexing='ij')
+    valid = shorts < longs
+    return shorts[valid], longs[valid]
+
+
+def crossover_signals(close, shorts, longs, means=None):
+    """
+    Build a 2-D SMA crossover signal matrix, one row per window pair
+
+    Matches Backtester.moving_average_strategy: 1 when the short SMA is above
+    the long SMA (from bar `short_window` onwards), 0 otherwise.
+
+    Parameters:
+    close: 1-D array of closing prices
+    shorts, longs: Aligned arrays of window lengths
+    means: Optional precomputed output of rolling_means
+
+    Returns an int8 array of shape (n_pairs, n_bars)
+    """
+    if means is None:
+        means = rolling_means(close, np.concatenate([shorts, longs]))
+
+    n = len(close)
+    signals = np.zeros((len(shorts), n), dtype=np.int8)
+    for row, (short_window, long_window) in enumerate(zip(shorts, longs)):
+        short_window = int(short_window)
+        # NaN comparisons are False, so bars before the long window stay flat
+        with np.errstate(invalid='ignore'):
+            signals[row, short_window:] = (
+                means[short_window][short_window:] > means[int(long_window)][short_window:]
+            )
+    return signals
+
+
+def strategy_returns_matrix(close, signals):
+    """
+    Daily strategy returns for every signal row (yesterday's signal x today's return)
+
+    Returns a float64 array of shape (n_pairs, n_bars - 1); the first bar has no return
+    and is dropped, mirroring Strategy_Returns.dropna()
+    """
+    close = np.asarray(close, dtype=np.float64)
+    returns = close[1:] / close[:-1] - 1
+    return signals[:, :-1] * returns
+
+
+def trade_counts(signals):
+    """
+    Trades per signal row, counted like performance_metrics' 'Total Trades'
+
+    A trade is one run of bars held long; an entry on the last bar never
+    earns a return, so it is not counted.
+    """
+    held = signals[:, :-1]
+    return np.count_nonzero(np.diff(held, axis=1, prepend=0) == 1, axis=1)
+
+
+def returns_matrix_metrics(strategy_returns, periods_per_year=252, risk_free_rate=0.02):
+    """
+    Vectorized performance metrics for each row of a 2-D returns matrix
+
+    Uses the same definitions as Backtester.get_performance_metrics.
+
+    Returns a dict of 1-D arrays: total_return, annualized_return, volatility,
+    sharpe_ratio, max_drawdown
+    """
+    strategy_returns = np.atleast_2d(strategy_returns)
+    days = strategy_returns.shape[1]
+
+    cumulative = np.cumprod(1 + strategy_returns, axis=1)
+    total_return = cumulative[:, -1] - 1
+    annualized_return = (1 + total_return) ** (periods_per_year / days) - 1
+
+    volatility = strategy_returns.std(axis=1, ddof=1) * np.sqrt(periods_per_year)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe_ratio = np.where(
+            volatility != 0, (annualized_return - risk_free_rate) / volatility, 0.0
+        )
+
+    # The curve starts at 1 on the first (return-less) bar
+    running_max = np.maximum(np.maximum.accumulate(cumulative, axis=1), 1.0)
+    max_drawdown = np.minimum(((cumulative - running_max) / running_max).min(axis=1), 0.0)
+
+    return {
+        'total_return': total_return,
+        'annualized_return': annualized_return,
+        'volatility': volatility,
+        'sharpe_ratio': sharpe_ratio,
+        'max_drawdown': max_drawdown,
+    }
+
+
+def sma_crossover_sweep(close, short_windows, long_windows, initial_capital=10000,
+                        periods_per_year=252, risk_free_rate=0.02):
+    """
+    Grid-search SMA crossover windows in one vectorized pass
+
+    Parameters:
+    close: 1-D array or Series of closing prices
+    short_windows: Candidate short-term windows
+    long_windows: Candidate long-term windows (pairs with short >= long are skipped)
+    initial_capital: Starting capital used for the final portfolio value
+
+    Returns a DataFrame with one row per window pair, sorted by Sharpe ratio
+    """
+    shorts, longs = window_pairs(short_windows, long_windows)
+    results = pair_metrics(close, shorts, longs, initial_capital, periods_per_year, risk_free_rate)
+    return results.sort_values('sharpe_ratio', ascending=False, ignore_index=True)
+
+
+def pair_metrics(close, shorts, longs, initial_capital=10000, periods_per_year=252, risk_free_rate=0.02):
+    """
+    Metrics of the SMA crossover for aligned (short, long) window pairs
+
+    Same columns as sma_crossover_sweep, in the order of the pairs given.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    shorts = np.asarray(shorts, dtype=np.int64)
+    longs = np.asarray(longs, dtype=np.int64)
+    if len(shorts) == 0 or len(close) < 2:
+        return pd.DataFrame(columns=SWEEP_COLUMNS)
+
+    signals = crossover_signals(close, shorts, longs)
+    strategy_returns = strategy_returns_matrix(close, signals)
+    metrics = returns_matrix_metrics(strategy_returns, periods_per_year, risk_free_rate)
+
+    results = pd.DataFrame({'short_window': shorts, 'long_window': longs, **metrics})
+    results['total_trades'] = trade_counts(signals)
+    results['final_value'] = initial_capital * (1 + results['total_return'])
+    return results
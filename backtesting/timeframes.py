@@ -0,0 +1,164 @@
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from indicators import data_fingerprint
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+def _wall_clock_ns(index):
+    """Bar timestamps as int64 nanoseconds of local wall-clock time"""
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.as_unit('ns').asi8
+
+
+def _resample_arrays(timestamps, columns, step):
+    """
+    Aggregate sorted bars into fixed-width buckets with one reduceat per column
+
+    Parameters:
+    timestamps: int64 wall-clock nanoseconds of each bar
+    columns: Dict of OHLCV name -> 1-D array
+    step: Bucket width in nanoseconds
+    """
+    buckets = timestamps // step
+    starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+    ends = np.concatenate((starts[1:], [len(timestamps)])) - 1
+
+    aggregated = {}
+    for col, values in columns.items():
+        if col == 'Open':
+            aggregated[col] = values[starts]
+        elif col == 'High':
+            aggregated[col] = np.maximum.reduceat(values, starts)
+        elif col == 'Low':
+            aggregated[col] = np.minimum.reduceat(values, starts)
+        elif col == 'Close':
+            aggregated[col] = values[ends]
+        elif col == 'Volume':
+            aggregated[col] = np.add.reduceat(values, starts)
+    return buckets[starts] * step, aggregated
+
+
+def resample_ohlcv(bars, rules=('5min', '15min', '1h', '1D')):
+    """
+    Resample intraday OHLCV bars to several timeframes in one vectorized sweep
+
+    Timestamps are converted once; each timeframe is then a single reduceat
+    pass, built from the previous (finer) timeframe whenever its width is a
+    multiple of it, so 1m -> 5m -> 15m -> 1h -> 1D never rescans the minute
+    bars. Buckets follow wall-clock time like DataFrame.resample (labels are
+    bucket starts); buckets without any bar are skipped rather than NaN-filled.
+
+    Parameters:
+    bars: OHLCV DataFrame with a sorted DatetimeIndex
+    rules: Target timeframes as pandas offsets ('5min', '15min', '1h', '1D')
+
+    Returns a dict of rule -> OHLCV DataFrame
+    """
+    tz = bars.index.tz
+    columns = [col for col in ('Open', 'High', 'Low', 'Close', 'Volume') if col in bars.columns]
+    source_step = 0
+    source_ns = _wall_clock_ns(bars.index)
+    source = {col: bars[col].to_numpy(dtype=np.float64) for col in columns}
+
+    resampled = {}
+    for rule in sorted(rules, key=lambda r: pd.Timedelta(r)):
+        step = pd.Timedelta(rule).value
+        if source_step and step % source_step:
+            # Not nested in the previous timeframe, start again from the base bars
+            source_ns = _wall_clock_ns(bars.index)
+            source = {col: bars[col].to_numpy(dtype=np.float64) for col in columns}
+
+        labels, aggregated = _resample_arrays(source_ns, source, step)
+        index = pd.DatetimeIndex(labels.view('datetime64[ns]'), name=bars.index.name)
+        resampled[rule] = pd.DataFrame(aggregated, index=index if tz is None else index.tz_localize(tz))
+        source_ns, source, source_step = labels, aggregated, step
+    return resampled
+
+
+def periods_per_year(index, trading_days=TRADING_DAYS_PER_YEAR):
+    """
+    Annualization factor implied by the bar frequency of an index
+
+    Intraday data uses the median number of bars per trading day, daily and
+    slower data the median spacing between bars (in trading days).
+    """
+    if len(index) < 2:
+        return trading_days
+    wall_clock = index.tz_localize(None) if index.tz is not None else index
+    days = wall_clock.normalize()
+    bars_per_day = np.median(np.unique(days.asi8, return_counts=True)[1])
+    if bars_per_day > 1:
+        return trading_days * bars_per_day
+
+    spacing_days = np.median(np.diff(wall_clock.asi8)) / pd.Timedelta('1D').value
+    # Calendar spacing to trading-day spacing (weekends are not traded)
+    return trading_days / max(1.0, round(spacing_days * 5 / 7))
+
+
+def align_to(lower_index, higher_frame, rule):
+    """
+    Forward-fill a higher-timeframe frame onto lower-timeframe bars without lookahead
+
+    Each lower bar only sees the last higher bar that had fully closed by the
+    time the lower bar itself closed.
+
+    Parameters:
+    lower_index: Index of the lower timeframe bars (e.g. 15-minute bars)
+    higher_frame: DataFrame on the higher timeframe (e.g. daily), labeled by bucket start
+    rule: Timeframe of higher_frame (e.g. '1D')
+    """
+    higher_close_time = _wall_clock_ns(higher_frame.index) + pd.Timedelta(rule).value
+    lower_ns = _wall_clock_ns(lower_index)
+    lower_step = np.median(np.diff(lower_ns)) if len(lower_ns) > 1 else 0
+    position = np.searchsorted(higher_close_time, lower_ns + lower_step, side='right') - 1
+
+    aligned = higher_frame.iloc[np.maximum(position, 0)].copy()
+    aligned.index = lower_index
+    aligned.loc[position < 0] = np.nan
+    return aligned
+
+
+class TimeframeCache:
+    def __init__(self, max_entries=64):
+        """
+        Session cache of resampled frames keyed by (symbol, data, timeframe)
+
+        Parameters:
+        max_entries: Resampled frames kept before the least recently used is evicted
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, symbol, data, rule, fingerprint=None):
+        """
+        Return `data` resampled to `rule`, building it only once
+
+        Parameters:
+        fingerprint: data_fingerprint(data) if the caller already has it
+        """
+        key = (symbol, fingerprint or data_fingerprint(data), rule)
+        if key not in self._entries:
+            self._entries[key] = resample_ohlcv(data, [rule])[rule]
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def build(self, symbol, data, rules=('5min', '15min', '1h', '1D')):
+        """Build several timeframes in one cascaded pass and cache them all"""
+        fingerprint = data_fingerprint(data)
+        missing = [rule for rule in rules if (symbol, fingerprint, rule) not in self._entries]
+        for rule, frame in resample_ohlcv(data, missing).items():
+            self._entries[(symbol, fingerprint, rule)] = frame
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return {rule: self.get(symbol, data, rule, fingerprint) for rule in rules}
+
+
+# Shared by every Backtester in the session
+default_timeframes = TimeframeCache()
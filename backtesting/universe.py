@@ -0,0 +1,179 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+from data_cache import OHLCVCache
+from price_store import UniverseStore
+from shared_arrays import SharedArray
+from sweep import crossover_signals, returns_matrix_metrics, strategy_returns_matrix, trade_counts
+
+# Worker-side views onto the shared price / strategy-return blocks
+_shared = {}
+
+
+def load_universe(symbols, start_date, end_date, cache=None, price_dtype=np.float64):
+    """
+    Load closing prices for many symbols aligned on one date index
+
+    Parameters:
+    price_dtype: dtype of the price block (np.float32 halves memory for large universes)
+
+    Returns (loaded_symbols, index, prices) where prices has shape
+    (n_symbols, n_dates) and is NaN wherever a symbol has no bar on that date
+    """
+    cache = cache or OHLCVCache()
+    closes = {}
+    for symbol in symbols:
+        try:
+            data = cache.get(symbol, start_date, end_date)
+        except Exception as e:
+            print(f"Error fetching data for {symbol}: {e}")
+            continue
+        if len(data):
+            closes[symbol] = data['Close'].tz_localize(None)
+
+    store = UniverseStore.from_series(closes, price_dtype)
+    return store.symbols, store.index, store.prices
+
+
+def _init_worker(prices_spec, returns_spec):
+    # Keep the SharedArray objects alive for the lifetime of the worker
+    _shared['blocks'] = (SharedArray.attach(prices_spec), SharedArray.attach(returns_spec))
+    _shared['prices'] = _shared['blocks'][0].array
+    _shared['returns'] = _shared['blocks'][1].array
+
+
+def _run_symbol(task):
+    """Run the SMA crossover on one row of the shared price block"""
+    row, short_window, long_window, periods_per_year = task
+    prices = _shared['prices'][row]
+
+    # Strategy runs on the symbol's own bars, results are scattered back onto the shared index
+    valid = np.flatnonzero(~np.isnan(prices))
+    if len(valid) < 2:
+        return row, None
+
+    close = prices[valid].astype(np.float64)
+    signals = crossover_signals(close, np.array([short_window]), np.array([long_window]))
+    strategy_returns = strategy_returns_matrix(close, signals)
+    _shared['returns'][row, valid[1:]] = strategy_returns[0]
+
+    metrics = {name: float(values[0]) for name, values in
+               returns_matrix_metrics(strategy_returns, periods_per_year).items()}
+    metrics['total_trades'] = int(trade_counts(signals)[0])
+    metrics['bars'] = len(close)
+    return row, metrics
+
+
+def portfolio_returns(strategy_returns, weights):
+    """
+    Combine per-symbol returns into one portfolio return series
+
+    Weights are renormalized every bar over the symbols that have a return on
+    that bar (daily rebalancing to the target weights).
+
+    Parameters:
+    strategy_returns: Array of shape (n_symbols, n_dates), NaN where a symbol has no bar
+    weights: 1-D array of target weights, one per symbol
+    """
+    available = ~np.isnan(strategy_returns)
+    weight_matrix = np.where(available, np.asarray(weights, dtype=np.float64)[:, None], 0.0)
+    total_weight = weight_matrix.sum(axis=0)
+    weighted = np.where(available, strategy_returns, 0.0) * weight_matrix
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(total_weight > 0, weighted.sum(axis=0) / total_weight, 0.0)
+
+
+def run_universe(symbols, start_date, end_date, short_window=20, long_window=50,
+                 weights=None, initial_capital=100000, processes=None, cache=None,
+                 periods_per_year=252, price_dtype=np.float64):
+    """
+    Backtest the SMA crossover over a universe of symbols in parallel
+
+    Prices are placed in shared memory once; worker processes read their row
+    and write strategy returns back into a second shared block, so no
+    DataFrames are pickled between processes.
+
+    Parameters:
+    symbols: List of symbols (e.g. ['RELIANCE.NS', 'TCS.NS', 'INFY.NS'])
+    start_date, end_date: Backtest range (YYYY-MM-DD)
+    short_window, long_window: SMA windows
+    weights: None for equal weight, or a dict of symbol -> weight
+    initial_capital: Starting capital of the combined portfolio
+    processes: Number of worker processes (None = CPU count, 1 = run in-process)
+    price_dtype: dtype of the shared price block (np.float32 for very large universes)
+
+    Returns a dict with 'equity' (portfolio value Series), 'returns' (per-symbol
+    strategy returns DataFrame) and 'metrics' (per-symbol metrics DataFrame)
+    """
+    loaded, index, prices = load_universe(symbols, start_date, end_date, cache, price_dtype)
+    if len(loaded) == 0:
+        print("No data available for any symbol.")
+        return None
+    return backtest_prices(loaded, index, prices, short_window, long_window, weights,
+                           initial_capital, processes, periods_per_year)
+
+
+def backtest_prices(symbols, index, prices, short_window=20, long_window=50, weights=None,
+                    initial_capital=100000, processes=None, periods_per_year=252):
+    """
+    Run the universe backtest on prices already in memory
+
+    Parameters:
+    symbols: Symbol per row of prices
+    index: Date index shared by all rows
+    prices: Array of shape (n_symbols, n_dates), NaN where a symbol has no bar
+
+    See run_universe for the remaining parameters and the result.
+    """
+    loaded = list(symbols)
+    n_symbols = len(loaded)
+    with SharedArray.create(prices) as shared_prices, \
+            SharedArray.create(shape=prices.shape, fill=np.nan) as shared_returns:
+        tasks = [(row, short_window, long_window, periods_per_year) for row in range(n_symbols)]
+        if processes == 1:
+            _shared.update(prices=shared_prices.array, returns=shared_returns.array)
+            results = list(map(_run_symbol, tasks))
+            _shared.clear()
+        else:
+            processes = min(processes or os.cpu_count() or 1, n_symbols)
+            initargs = (shared_prices.spec, shared_returns.spec)
+            with ProcessPoolExecutor(processes, initializer=_init_worker, initargs=initargs) as pool:
+                chunksize = max(1, n_symbols // (4 * processes))
+                results = list(pool.map(_run_symbol, tasks, chunksize=chunksize))
+
+        strategy_returns = shared_returns.array.copy()
+
+    # Combine into one portfolio equity curve
+    if weights is None:
+        weight_array = np.ones(n_symbols)
+    else:
+        weight_array = np.array([weights.get(symbol, 0.0) for symbol in loaded], dtype=np.float64)
+    combined = portfolio_returns(strategy_returns, weight_array)
+    equity = pd.Series(initial_capital * np.cumprod(1 + combined), index=index, name='Portfolio_Value')
+
+    metrics = pd.DataFrame({loaded[row]: m for row, m in results if m is not None}).T
+    portfolio = {name: float(values[0]) for name, values in
+                 returns_matrix_metrics(combined[1:], periods_per_year).items()}
+    portfolio['total_trades'] = int(metrics['total_trades'].sum()) if len(metrics) else 0
+    portfolio['bars'] = len(index)
+    metrics.loc['Portfolio'] = portfolio
+    metrics['weight'] = pd.Series(weight_array / weight_array.sum(), index=loaded)
+
+    print(f"Universe backtest complete: {len(metrics) - 1} symbols, {len(index)} dates")
+    return {
+        'equity': equity,
+        'returns': pd.DataFrame(strategy_returns.T, index=index, columns=loaded),
+        'metrics': metrics,
+    }
+
+
+if __name__ == "__main__":
+    # A handful of NIFTY 50 constituents
+    nifty_sample = ['RELIANCE.NS', 'TCS.NS', 'HDFCBANK.NS', 'INFY.NS', 'ICICIBANK.NS',
+                    'HINDUNILVR.NS', 'ITC.NS', 'SBIN.NS', 'BHARTIARTL.NS', 'LT.NS']
+    result = run_universe(nifty_sample, '2015-01-01', '2024-01-01', short_window=50, long_window=200)
+    if result is not None:
+        print(result['metrics'])
+        print(f"Final Portfolio Value: {result['equity'].iloc[-1]:,.2f}")
@@ -0,0 +1,144 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from metrics import performance_metrics
+from shared_arrays import SharedArray
+from sweep import (crossover_signals, returns_matrix_metrics, rolling_means,
+                   strategy_returns_matrix, window_pairs)
+
+# Worker-side views onto the shared returns / signal matrices
+_shared = {}
+
+
+def walk_forward_folds(n_bars, train_size, test_size, step=None):
+    """
+    Rolling train/test folds over bar positions
+
+    Parameters:
+    n_bars: Number of bars available
+    train_size: Bars in each training window
+    test_size: Bars in each out-of-sample test window
+    step: Bars to roll forward between folds (defaults to test_size, so test
+          windows are back-to-back); at least test_size, since overlapping
+          test windows would count the shared bars twice when stitched
+
+    Returns a list of (train_start, train_end, test_end) positions; the test
+    window is [train_end, test_end)
+    """
+    step = step or test_size
+    if step < test_size:
+        raise ValueError("step must be at least test_size so test windows do not overlap")
+    folds = []
+    train_start = 0
+    while train_start + train_size < n_bars:
+        train_end = train_start + train_size
+        folds.append((train_start, train_end, min(train_end + test_size, n_bars)))
+        train_start += step
+    return folds
+
+
+def _init_worker(returns_spec):
+    _shared['block'] = SharedArray.attach(returns_spec)
+    _shared['returns'] = _shared['block'].array
+
+
+def _optimize_fold(task):
+    """Pick the window pair with the best training metric for one fold"""
+    train_start, train_end, objective, periods_per_year = task
+    train_metrics = returns_matrix_metrics(_shared['returns'][:, train_start:train_end], periods_per_year)
+    scores = np.nan_to_num(train_metrics[objective], nan=-np.inf)
+    best = int(np.argmax(scores))
+    return best, float(train_metrics[objective][best])
+
+
+def walk_forward(close, short_windows, long_windows, train_size=756, test_size=252, step=None,
+                 index=None, objective='sharpe_ratio', initial_capital=10000, processes=None,
+                 periods_per_year=252):
+    """
+    Walk-forward optimization of SMA crossover windows
+
+    All moving averages, signals and per-pair returns are computed once over
+    the full history (they only look backwards, so nothing leaks from the
+    future). Each fold then just slices that shared matrix: the best pair on
+    the training slice is applied to the following test slice, and the test
+    slices are stitched into one out-of-sample equity curve.
+
+    Parameters:
+    close: 1-D array or Series of closing prices
+    short_windows, long_windows: Candidate windows to optimize over
+    train_size, test_size, step: Fold sizes in bars (see walk_forward_folds)
+    index: Optional date index for close (taken from close if it is a Series)
+    objective: Training metric to maximize (a returns_matrix_metrics key)
+    initial_capital: Starting capital of the out-of-sample equity curve
+    processes: Worker processes for the folds (None = CPU count, 1 = in-process)
+
+    Returns a dict with 'folds' (DataFrame), 'equity' (Series), 'returns'
+    (Series) and 'metrics' (out-of-sample performance metrics)
+    """
+    if index is None and isinstance(close, pd.Series):
+        index = close.index
+    close = np.asarray(close, dtype=np.float64)
+    index = pd.RangeIndex(len(close)) if index is None else index
+
+    shorts, longs = window_pairs(short_windows, long_windows)
+    # Return j is earned on bar j + 1 while holding signal j
+    folds = walk_forward_folds(len(close) - 1, train_size, test_size, step)
+    if len(shorts) == 0 or not folds:
+        print("Not enough data or window pairs for a walk-forward run.")
+        return None
+
+    means = rolling_means(close, np.concatenate([shorts, longs]))
+    signals = crossover_signals(close, shorts, longs, means)
+    strategy_returns = strategy_returns_matrix(close, signals)
+
+    tasks = [(train_start, train_end, objective, periods_per_year) for train_start, train_end, _ in folds]
+    if processes == 1:
+        _shared['returns'] = strategy_returns
+        chosen = list(map(_optimize_fold, tasks))
+        _shared.clear()
+    else:
+        processes = min(processes or os.cpu_count() or 1, len(folds))
+        with SharedArray.create(strategy_returns) as shared_returns:
+            with ProcessPoolExecutor(processes, initializer=_init_worker,
+                                     initargs=(shared_returns.spec,)) as pool:
+                chosen = list(pool.map(_optimize_fold, tasks))
+
+    # Stitch the out-of-sample slices together
+    rows = []
+    oos_returns = []
+    oos_positions = []
+    oos_bars = []
+    for (train_start, train_end, test_end), (best, train_score) in zip(folds, chosen):
+        test_returns = strategy_returns[best, train_end:test_end]
+        test_metrics = returns_matrix_metrics(test_returns, periods_per_year)
+        oos_returns.append(test_returns)
+        oos_positions.append(signals[best, train_end:test_end])
+        oos_bars.append(np.arange(train_end, test_end) + 1)
+        rows.append({
+            'train_start': index[train_start + 1],
+            'test_start': index[train_end + 1],
+            'test_end': index[test_end],
+            'short_window': int(shorts[best]),
+            'long_window': int(longs[best]),
+            f"train_{objective}": train_score,
+            'test_total_return': float(test_metrics['total_return'][0]),
+            f"test_{objective}": float(test_metrics[objective][0]),
+        })
+
+    oos_returns = np.concatenate(oos_returns)
+    oos_bars = np.concatenate(oos_bars)
+    oos_index = index[oos_bars]
+    market = close[oos_bars] / close[oos_bars - 1] - 1
+    returns = pd.Series(oos_returns, index=oos_index, name='Strategy_Returns')
+
+    print(f"Walk-forward complete: {len(folds)} folds, {len(shorts)} window pairs")
+    return {
+        'folds': pd.DataFrame(rows),
+        'returns': returns,
+        'equity': (initial_capital * (1 + returns).cumprod()).rename('Portfolio_Value'),
+        'metrics': performance_metrics(oos_returns, market, np.concatenate(oos_positions),
+                                       initial_capital, periods_per_year),
+    }
@@ -0,0 +1,166 @@
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import quote as url_quote
+
+import requests
+
+NSE_BASE_URL = 'https://www.nseindia.com'
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) '
+                  'Chrome/124.0 Safari/537.36',
+    'Accept': 'application/json, text/plain, */*',
+    'Accept-Language': 'en-US,en;q=0.9',
+}
+
+
+class RateLimiter:
+    def __init__(self, rate, burst=1):
+        """
+        Thread-safe token bucket
+
+        Parameters:
+        rate: Requests allowed per second
+        burst: Requests that may be sent back-to-back before throttling
+        """
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class NSEQuoteClient:
+    def __init__(self, base_url=NSE_BASE_URL, max_workers=4, rate=3.0, retries=3,
+                 backoff=0.5, ttl=900, cache_path=None, timeout=10):
+        """
+        Fetch NSE equity quotes once per symbol over a shared HTTP session
+
+        Only the cash-market quote-equity endpoint is queried. Unlike
+        nsepython's nse_quote, F&O symbols are not routed to quote-derivative:
+        holdings are equities, and temp.py reads the sector and market cap from
+        the equity payload (industryInfo, securityInfo and priceInfo).
+
+        Parameters:
+        base_url: NSE site root (point it at a local stub server for offline runs)
+        max_workers: Concurrent requests in flight
+        rate: Maximum requests per second across all workers
+        retries: Retry attempts per symbol on errors, throttling or expired cookies
+        backoff: Base delay in seconds for exponential backoff between retries
+        ttl: Seconds a cached quote stays valid
+        cache_path: Optional JSON file to persist cached quotes between runs
+        timeout: Per-request timeout in seconds
+        """
+        self.base_url = base_url.rstrip('/')
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.ttl = ttl
+        self.timeout = timeout
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.limiter = RateLimiter(rate, burst=max_workers)
+
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        self._warmed = False
+        self._session_lock = threading.Lock()
+
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+        self._load_cache()
+
+    def _load_cache(self):
+        if self.cache_path is None or not self.cache_path.exists():
+            return
+        try:
+            self._cache = json.loads(self.cache_path.read_text())
+        except (OSError, json.JSONDecodeError):
+            self._cache = {}
+
+    def _save_cache(self):
+        if self.cache_path is None:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._cache_lock:
+            self.cache_path.write_text(json.dumps(self._cache))
+
+    def _cached(self, symbol):
+        with self._cache_lock:
+            entry = self._cache.get(symbol)
+        if entry is not None and time.time() - entry[0] < self.ttl:
+            return entry[1]
+        return None
+
+    def _warm_up(self, force=False):
+        """NSE only serves the API to sessions holding cookies from the main site"""
+        with self._session_lock:
+            if self._warmed and not force:
+                return
+            self.limiter.acquire()
+            self.session.get(self.base_url, timeout=self.timeout)
+            self._warmed = True
+
+    def _fetch(self, symbol):
+        url = f"{self.base_url}/api/quote-equity?symbol={url_quote(symbol)}"
+        for attempt in range(self.retries + 1):
+            try:
+                self._warm_up()
+                self.limiter.acquire()
+                response = self.session.get(url, timeout=self.timeout)
+
+                if response.status_code in (401, 403):
+                    # Cookies expired, refresh them before the next attempt
+                    self._warm_up(force=True)
+                elif response.status_code == 429 or response.status_code >= 500:
+                    pass
+                else:
+                    response.raise_for_status()
+                    return response.json()
+            except (requests.RequestException, ValueError) as e:
+                if attempt == self.retries:
+                    print(f"Error fetching quote for {symbol}: {e}")
+                    return None
+
+            time.sleep(self.backoff * 2 ** attempt * (1 + random.random()))
+
+        print(f"Error fetching quote for {symbol}: retries exhausted")
+        return None
+
+    def quote(self, symbol):
+        """Return the quote payload for one symbol (None if it could not be fetched)"""
+        payload = self._cached(symbol)
+        if payload is None:
+            payload = self._fetch(symbol)
+            if payload is not None:
+                with self._cache_lock:
+                    self._cache[symbol] = (time.time(), payload)
+        return payload
+
+    def quotes(self, symbols):
+        """
+        Fetch quotes for many symbols concurrently, each symbol at most once
+
+        Returns a dict of symbol -> quote payload (None for failures)
+        """
+        unique = list(dict.fromkeys(symbols))
+        with ThreadPoolExecutor(self.max_workers) as pool:
+            payloads = list(pool.map(self.quote, unique))
+        self._save_cache()
+        fetched = sum(payload is not None for payload in payloads)
+        print(f"Fetched NSE quotes for {fetched}/{len(unique)} symbols")
+        return dict(zip(unique, payloads))
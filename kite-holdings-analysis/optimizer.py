@@ -0,0 +1,289 @@
+import sys
+
+import numpy as np
+import pandas as pd
+
+from risk import BACKTESTING_DIR, TRADING_DAYS, pairwise_covariance
+
+
+def _check_cap(n_assets, max_weight):
+    if max_weight * n_assets < 1.0:
+        raise ValueError(f"max_weight={max_weight} cannot fully invest {n_assets} assets")
+
+
+def _solve_qp(Q, q, max_weight=1.0, w=None, max_iterations=2000, tol=1e-12):
+    """
+    min 0.5 w'Qw - q'w  subject to  sum(w) = 1, 0 <= w <= max_weight
+
+    Primal active-set method: each step solves the equality-constrained
+    problem on the free assets, walks towards it until a bound blocks, and
+    releases the bound with the most negative multiplier once no step is
+    possible. Converges exactly in a finite number of steps, and a warm start
+    from a nearby solution usually needs only a handful of them.
+
+    Parameters:
+    Q: Positive definite n x n matrix
+    q: Linear term
+    max_weight: Upper bound per asset
+    w: Feasible starting point (defaults to equal weights)
+    """
+    n = len(q)
+    w = np.full(n, 1.0 / n) if w is None else w.copy()
+    at_lower = w <= tol
+    at_upper = w >= max_weight - tol
+    for _ in range(max_iterations):
+        free = ~(at_lower | at_upper)
+        gradient = Q @ w - q
+        f = np.flatnonzero(free)
+        k = len(f)
+
+        step = np.zeros(n)
+        if k > 1:
+            kkt = np.empty((k + 1, k + 1))
+            kkt[:k, :k] = Q[np.ix_(f, f)]
+            kkt[:k, k] = kkt[k, :k] = 1.0
+            kkt[k, k] = 0.0
+            solution = np.linalg.solve(kkt, np.concatenate([-gradient[f], [0.0]]))
+            step[f] = solution[:k]
+
+        if np.abs(step).max() <= 1e-12:
+            # Stationary on the working set: check the bound multipliers
+            nu = gradient[f].mean() if k else gradient[at_lower].min() if at_lower.any() else gradient.max()
+            lower_multipliers = np.where(at_lower, gradient - nu, np.inf)
+            upper_multipliers = np.where(at_upper, nu - gradient, np.inf)
+            worst_lower, worst_upper = lower_multipliers.argmin(), upper_multipliers.argmin()
+            if min(lower_multipliers[worst_lower], upper_multipliers[worst_upper]) >= -1e-12:
+                return np.clip(w, 0.0, max_weight)
+            if lower_multipliers[worst_lower] <= upper_multipliers[worst_upper]:
+                at_lower[worst_lower] = False
+            else:
+                at_upper[worst_upper] = False
+            continue
+
+        # Longest feasible step along the direction, capped at the full step
+        with np.errstate(divide='ignore', invalid='ignore'):
+            to_lower = np.where(step < -1e-15, -w / step, np.inf)
+            to_upper = np.where(step > 1e-15, (max_weight - w) / step, np.inf)
+        blocking_lower, blocking_upper = to_lower.argmin(), to_upper.argmin()
+        alpha = min(1.0, to_lower[blocking_lower], to_upper[blocking_upper])
+        w = w + alpha * step
+        if alpha < 1.0:
+            if to_lower[blocking_lower] <= to_upper[blocking_upper]:
+                w[blocking_lower], at_lower[blocking_lower] = 0.0, True
+            else:
+                w[blocking_upper], at_upper[blocking_upper] = max_weight, True
+    return np.clip(w, 0.0, max_weight)
+
+
+def min_variance(cov, max_weight=1.0):
+    """
+    Long-only minimum variance weights
+
+    Parameters:
+    cov: Covariance matrix (n x n array)
+    max_weight: Cap per asset
+    """
+    cov = np.asarray(cov, dtype=np.float64)
+    _check_cap(len(cov), max_weight)
+    return _solve_qp(cov, np.zeros(len(cov)), max_weight)
+
+
+def max_sharpe(mean, cov, risk_free_rate=0.0, max_weight=1.0, n_points=15, refinements=30):
+    """
+    Long-only maximum Sharpe ratio weights
+
+    Walks the efficient frontier (max mean'w - risk_aversion/2 * w'Cw) over a
+    geometric grid of risk aversions, then narrows in on the best point with a
+    golden-section search over log risk aversion; the Sharpe ratio is
+    unimodal along the frontier. Each solve is warm-started from the last.
+
+    Parameters:
+    mean: Expected return per asset (same period as cov)
+    cov: Covariance matrix
+    risk_free_rate: Risk-free return per period
+    max_weight: Cap per asset
+    n_points: Coarse frontier points
+    refinements: Golden-section steps after the coarse pass
+    """
+    mean = np.asarray(mean, dtype=np.float64)
+    cov = np.asarray(cov, dtype=np.float64)
+    _check_cap(len(mean), max_weight)
+    scale = np.abs(mean).max() / np.linalg.eigvalsh(cov)[-1] if np.abs(mean).max() > 0 else 1.0
+    cache = {}
+
+    def solve(log_aversion, start):
+        w = _solve_qp(np.exp(log_aversion) * cov, mean, max_weight, start)
+        cache[log_aversion] = w
+        return w, (mean @ w - risk_free_rate) / np.sqrt(w @ cov @ w)
+
+    # From minimum variance towards maximum return
+    grid = np.log(scale) + np.linspace(np.log(1e4), np.log(1e-2), n_points)
+    w = None
+    sharpes = []
+    for log_aversion in grid:
+        w, sharpe = solve(log_aversion, w)
+        sharpes.append(sharpe)
+    best = int(np.argmax(sharpes))
+    if best in (0, n_points - 1):
+        return cache[grid[best]]
+
+    # Golden-section search between the neighbours of the best grid point
+    ratio = (np.sqrt(5) - 1) / 2
+    low, high = grid[best + 1], grid[best - 1]
+    w_start = cache[grid[best]]
+    a, b = high - ratio * (high - low), low + ratio * (high - low)
+    (wa, sa), (wb, sb) = solve(a, w_start), solve(b, w_start)
+    for _ in range(refinements):
+        if sa > sb:
+            high, b, wb, sb = b, a, wa, sa
+            a = high - ratio * (high - low)
+            wa, sa = solve(a, wb)
+        else:
+            low, a, wa, sa = a, b, wb, sb
+            b = low + ratio * (high - low)
+            wb, sb = solve(b, wa)
+    return wa if sa > sb else wb
+
+
+def risk_parity(cov, budgets=None, iterations=500, tol=1e-10):
+    """
+    Equal (or budgeted) risk contribution weights by cyclical coordinate descent
+
+    Minimizes 0.5 x'Cx - sum(b log x), whose solution scaled to sum 1 gives
+    each asset a risk contribution proportional to its budget. Each
+    coordinate update is a closed-form quadratic root and C @ x is updated
+    incrementally, so a sweep costs O(n^2).
+
+    Parameters:
+    cov: Covariance matrix
+    budgets: Risk budget per asset (defaults to equal)
+    """
+    cov = np.asarray(cov, dtype=np.float64)
+    n = len(cov)
+    budgets = np.full(n, 1.0 / n) if budgets is None else np.asarray(budgets, dtype=np.float64) / np.sum(budgets)
+    diagonal = np.diag(cov)
+    x = 1.0 / np.sqrt(diagonal)
+    x *= np.sqrt(budgets.sum() / (x @ cov @ x))
+    cov_x = cov @ x
+    for _ in range(iterations):
+        previous = x.copy()
+        for i in range(n):
+            c = cov_x[i] - diagonal[i] * x[i]
+            new = (-c + np.sqrt(c * c + 4 * diagonal[i] * budgets[i])) / (2 * diagonal[i])
+            cov_x += cov[:, i] * (new - x[i])
+            x[i] = new
+        if np.abs(x - previous).max() < tol * x.max():
+            break
+    return x / x.sum()
+
+
+def risk_contributions(weights, cov):
+    """Share of portfolio variance coming from each asset"""
+    weights = np.asarray(weights, dtype=np.float64)
+    contributions = weights * (np.asarray(cov) @ weights)
+    return contributions / contributions.sum()
+
+
+def target_weights(returns, method='min_variance', max_weight=1.0, risk_free_rate=0.02, shrinkage=0.1):
+    """
+    Optimal long-only weights from a daily returns matrix
+
+    Parameters:
+    returns: DataFrame of daily returns (dates x symbols), NaN where a symbol has no bar
+    method: 'min_variance', 'risk_parity' or 'max_sharpe'
+    max_weight: Cap per asset (not applied to risk parity, which has no free cap)
+    risk_free_rate: Annual risk-free rate for max_sharpe
+    shrinkage: Blend of the sample covariance towards its diagonal (stabilizes
+               large universes with limited history)
+
+    Returns a weight Series indexed by symbol
+    """
+    values = returns.to_numpy(dtype=np.float64)
+    cov = pairwise_covariance(values) * TRADING_DAYS
+    cov = (1 - shrinkage) * cov + shrinkage * np.diag(np.diag(cov))
+
+    if method == 'min_variance':
+        weights = min_variance(cov, max_weight)
+    elif method == 'risk_parity':
+        weights = risk_parity(cov)
+    elif method == 'max_sharpe':
+        weights = max_sharpe(np.nan_to_num(np.nanmean(values, axis=0)) * TRADING_DAYS, cov, risk_free_rate, max_weight)
+    else:
+        raise ValueError("method must be 'min_variance', 'risk_parity' or 'max_sharpe'")
+    return pd.Series(weights, index=returns.columns, name=method)
+
+
+def trade_list(quantities, prices, weights, cash=0.0, no_trade_band=0.005, max_turnover=None, charges=None):
+    """
+    Integer-share orders moving current holdings towards target weights
+
+    Parameters:
+    quantities: Current shares per symbol (Series)
+    prices: Last price per symbol (Series)
+    weights: Target weight per symbol (Series; symbols missing from it are sold)
+    cash: Uninvested cash available for buys
+    no_trade_band: Skip holdings whose weight is within this distance of the target
+    max_turnover: Cap on traded value as a fraction of portfolio value; trades
+                  are scaled down proportionally to fit
+    Buys are scaled down the same way if, with all charges, they would need
+    more than the cash plus the net sell proceeds.
+    charges: Charges model with compute(side, turnover) and max_buy_turnover(cash)
+             (defaults to NSE delivery charges from backtesting/execution.py)
+
+    Returns a DataFrame of orders, largest trade first
+    """
+    if charges is None:
+        if str(BACKTESTING_DIR) not in sys.path:
+            sys.path.append(str(BACKTESTING_DIR))
+        from execution import IndianEquityCharges
+        charges = IndianEquityCharges()
+
+    symbols = quantities.index.union(weights.index)
+    quantities = quantities.reindex(symbols).fillna(0.0).to_numpy(dtype=np.float64)
+    prices = prices.reindex(symbols).to_numpy(dtype=np.float64)
+    target = weights.reindex(symbols).fillna(0.0).to_numpy(dtype=np.float64)
+
+    values = quantities * prices
+    total = values.sum() + cash
+    current = values / total
+    trade_values = np.where(np.abs(target - current) < no_trade_band, 0.0, (target - current) * total)
+    # A full exit is always allowed through the band
+    trade_values[(target == 0) & (quantities > 0)] = -values[(target == 0) & (quantities > 0)]
+
+    turnover = np.abs(trade_values).sum()
+    if max_turnover is not None and turnover > max_turnover * total:
+        trade_values *= max_turnover * total / turnover
+
+    # Whole shares only: buys round down so they stay within the budget
+    trade_qty = np.where(trade_values > 0, np.floor(trade_values / prices), np.fix(trade_values / prices))
+    trade_qty = np.maximum(trade_qty, -quantities)
+    exits = trade_values == -values
+    trade_qty[exits] = -quantities[exits]
+
+    # Sell proceeds net of their charges fund the buys and the buys' own charges
+    sells, buys = trade_qty < 0, trade_qty > 0
+    sell_values = -trade_qty[sells] * prices[sells]
+    available = cash + sell_values.sum() - sum(charges.compute(-1, value) for value in sell_values)
+    buy_values = trade_qty[buys] * prices[buys]
+    spend = buy_values + np.array([charges.compute(1, value) for value in buy_values])
+    if spend.sum() > available:
+        # Give each buy its share of the cash and solve for the quantity whose charges fit in it
+        budgets = max(available, 0.0) * spend / spend.sum()
+        affordable = np.array([charges.max_buy_turnover(budget) for budget in budgets])
+        trade_qty[buys] = np.minimum(trade_qty[buys], np.floor(affordable / prices[buys]))
+
+    orders = pd.DataFrame({
+        'Symbol': symbols,
+        'Price': prices,
+        'Current Qty': quantities,
+        'Target Qty': quantities + trade_qty,
+        'Trade Qty': trade_qty,
+        'Trade Value': trade_qty * prices,
+        'Current %': current * 100,
+        'Target %': target * 100,
+    })
+    orders = orders[orders['Trade Qty'] != 0].copy()
+    orders['Action'] = np.where(orders['Trade Qty'] > 0, 'BUY', 'SELL')
+    orders['Est. Charges'] = [charges.compute(1 if qty > 0 else -1, abs(value))
+                              for qty, value in zip(orders['Trade Qty'], orders['Trade Value'])]
+    return orders.sort_values('Trade Value', key=np.abs, ascending=False).reset_index(drop=True)
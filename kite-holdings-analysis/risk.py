@@ -0,0 +1,251 @@
+import sys
+from pathlib import Path
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+BACKTESTING_DIR = Path(__file__).resolve().parent.parent / 'backtesting'
+NIFTY = '^NSEI'
+TRADING_DAYS = 252
+
+# summary() keys shown as a percentage or a plain ratio; the rest are rupee amounts
+PERCENT_KEYS = ('Annualized Volatility',)
+RATIO_KEYS = ('Portfolio Beta',)
+
+
+def load_returns(symbols, start_date, end_date, benchmark=NIFTY, suffix='.NS', cache=None):
+    """
+    Daily returns of every holding and the benchmark on one aligned date index
+
+    Prices come from the backtesting OHLCVCache, so repeated runs only download
+    the days not cached yet.
+
+    Parameters:
+    symbols: NSE symbols as in the Kite export (e.g. 'TCS')
+    start_date, end_date: History window
+    benchmark: Benchmark ticker (NIFTY 50 by default)
+    suffix: Yahoo suffix appended to each symbol
+    cache: Optional OHLCVCache (defaults to the shared on-disk cache)
+
+    Returns (returns DataFrame dates x symbols, benchmark return Series). Dates
+    without a benchmark bar are dropped; a holding with no bar on a date (e.g.
+    before it listed) keeps NaN there, which PortfolioRisk and the optimizer
+    skip pair by pair instead of counting as a flat day.
+    """
+    if str(BACKTESTING_DIR) not in sys.path:
+        sys.path.append(str(BACKTESTING_DIR))
+    from universe import load_universe
+
+    tickers = {f"{symbol}{suffix}": symbol for symbol in symbols}
+    loaded, index, prices = load_universe([*tickers, benchmark], start_date, end_date, cache)
+    if benchmark not in loaded:
+        raise ValueError(f"No history for benchmark {benchmark}")
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        returns = prices[:, 1:] / prices[:, :-1] - 1
+    frame = pd.DataFrame(returns.T, index=index[1:], columns=[tickers.get(t, t) for t in loaded])
+    benchmark_returns = frame.pop(benchmark)
+    valid = benchmark_returns.notna().to_numpy()
+    return frame[valid], benchmark_returns[valid]
+
+
+def pairwise_covariance(values):
+    """
+    Sample covariance of a returns matrix with NaN gaps
+
+    Each pair uses the dates both holdings have, so a recently listed holding
+    is estimated from its own history rather than zero-filled returns (which
+    pull its variance, covariances and beta towards zero). Pairs that never
+    overlap get 0.
+    """
+    return np.nan_to_num(pd.DataFrame(values).cov().to_numpy())
+
+
+def format_summary(summary):
+    """Format PortfolioRisk.summary() values for printing"""
+    formatted = {}
+    for key, value in summary.items():
+        if key in PERCENT_KEYS:
+            formatted[key] = f"{value:.2%}"
+        elif key in RATIO_KEYS:
+            formatted[key] = f"{value:.2f}"
+        else:
+            formatted[key] = f"₹{value:,.2f}"
+    return formatted
+
+
+class PortfolioRisk:
+    def __init__(self, returns, weights, benchmark_returns=None, portfolio_value=1.0):
+        """
+        Risk analytics for a long-only holdings portfolio on a returns matrix
+
+        Everything is computed on one (dates x holdings) float64 array: betas
+        are a single matrix-vector regression, VaR/CVaR work on the portfolio
+        return vector and Monte Carlo paths are simulated in batches.
+
+        Parameters:
+        returns: DataFrame of daily returns (dates x symbols), e.g. from load_returns;
+                 NaN where a holding has no bar
+        weights: Portfolio weight per symbol (Series or array, normalized to sum to 1)
+        benchmark_returns: Optional benchmark return Series on the same dates
+        portfolio_value: Market value used to express VaR/CVaR in rupees
+        """
+        self.symbols = list(returns.columns)
+        self.index = returns.index
+        self.returns = returns.to_numpy(dtype=np.float64)
+        if isinstance(weights, pd.Series):
+            weights = weights.reindex(self.symbols).fillna(0.0).to_numpy()
+        weights = np.asarray(weights, dtype=np.float64)
+        self.weights = weights / weights.sum()
+        self.benchmark = None if benchmark_returns is None else np.asarray(benchmark_returns, dtype=np.float64)
+        self.portfolio_value = portfolio_value
+
+    def portfolio_returns(self):
+        """Daily portfolio returns; holdings without a bar on a date are left out and the rest reweighted"""
+        available = ~np.isnan(self.returns)
+        weights = np.where(available, self.weights, 0.0)
+        total = weights.sum(axis=1)
+        weighted = (np.where(available, self.returns, 0.0) * weights).sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(total > 0, weighted / total, 0.0)
+
+    def covariance(self, annualize=False):
+        cov = pairwise_covariance(self.returns) * (TRADING_DAYS if annualize else 1)
+        return pd.DataFrame(cov, index=self.symbols, columns=self.symbols)
+
+    def correlation(self):
+        cov = self.covariance().to_numpy()
+        std = np.sqrt(np.diag(cov))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = cov / np.outer(std, std)
+        return pd.DataFrame(corr, index=self.symbols, columns=self.symbols)
+
+    def betas(self):
+        """
+        Beta, annualized alpha and R-squared of every holding against the benchmark
+
+        One least-squares fit for all holdings: beta = cov(r, m) / var(m), each
+        holding over the dates it has a bar (the benchmark is demeaned over the
+        same dates).
+        """
+        if self.benchmark is None:
+            raise ValueError("Benchmark returns are required for beta")
+        available = ~np.isnan(self.returns)
+        counts = available.sum(axis=0)
+        returns = np.where(available, self.returns, 0.0)
+        market = np.where(available, self.benchmark[:, None], 0.0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            returns_mean = returns.sum(axis=0) / counts
+            market_mean = market.sum(axis=0) / counts
+            demeaned = np.where(available, returns - returns_mean, 0.0)
+            market = np.where(available, market - market_mean, 0.0)
+            covariance = (market * demeaned).sum(axis=0)
+            market_var = (market ** 2).sum(axis=0)
+            beta = covariance / market_var
+            alpha = returns_mean - beta * market_mean
+            r_squared = covariance ** 2 / (market_var * (demeaned ** 2).sum(axis=0))
+        return pd.DataFrame({'Beta': beta, 'Alpha (ann.)': alpha * TRADING_DAYS, 'R2': r_squared},
+                            index=self.symbols)
+
+    def portfolio_beta(self):
+        return float(self.betas()['Beta'].to_numpy() @ self.weights)
+
+    def parametric_var(self, confidence=0.95, horizon=1):
+        """
+        Gaussian VaR and CVaR of the portfolio over `horizon` days, as positive rupee losses
+        """
+        returns = self.portfolio_returns()
+        mu = returns.mean() * horizon
+        sigma = returns.std(ddof=1) * np.sqrt(horizon)
+        normal = NormalDist()
+        z = normal.inv_cdf(1 - confidence)
+        var = -(mu + z * sigma)
+        cvar = sigma * normal.pdf(z) / (1 - confidence) - mu
+        return {'VaR': var * self.portfolio_value, 'CVaR': cvar * self.portfolio_value}
+
+    def historical_var(self, confidence=0.95, horizon=1):
+        """
+        Empirical VaR and CVaR from overlapping `horizon`-day portfolio returns
+        """
+        growth = np.concatenate([[0.0], np.cumsum(np.log1p(self.portfolio_returns()))])
+        returns = np.expm1(growth[horizon:] - growth[:-horizon])
+        cutoff = np.quantile(returns, 1 - confidence)
+        tail = returns[returns <= cutoff]
+        return {'VaR': -cutoff * self.portfolio_value, 'CVaR': -tail.mean() * self.portfolio_value}
+
+    def monte_carlo(self, n_paths=10000, horizon=21, confidence=0.95, vol_multiplier=1.0,
+                    market_shock=0.0, seed=None, max_batch_elements=2 ** 23):
+        """
+        Simulate correlated holding returns and report the portfolio P&L distribution
+
+        Daily returns are drawn from a multivariate normal (Cholesky factor of
+        the sample covariance) and compounded per holding, so the portfolio
+        drifts with its own weights along each path. Paths are generated in
+        batches of at most max_batch_elements random numbers to bound memory.
+
+        Parameters:
+        n_paths: Simulated paths
+        horizon: Days per path
+        confidence: VaR/CVaR confidence level
+        vol_multiplier: Scale volatility for stress scenarios (e.g. 2.0)
+        market_shock: Instant benchmark move applied through each holding's beta (e.g. -0.1)
+        seed: Random seed
+
+        Returns a dict with the P&L per path and its VaR/CVaR/percentiles
+        """
+        rng = np.random.default_rng(seed)
+        mean = np.nan_to_num(np.nanmean(self.returns, axis=0))
+        cov = pairwise_covariance(self.returns) * vol_multiplier ** 2
+        try:
+            factor = np.linalg.cholesky(cov)
+        except np.linalg.LinAlgError:
+            # Fewer dates than holdings (or duplicated series): clip to the PSD part
+            eigenvalues, eigenvectors = np.linalg.eigh(cov)
+            factor = eigenvectors * np.sqrt(np.clip(eigenvalues, 0, None))
+
+        shock = 1.0
+        if market_shock:
+            shock = 1 + self.betas()['Beta'].to_numpy() * market_shock
+
+        n_assets = len(self.symbols)
+        batch = max(1, max_batch_elements // (horizon * n_assets))
+        pnl = np.empty(n_paths)
+        for start in range(0, n_paths, batch):
+            size = min(batch, n_paths - start)
+            daily = mean + rng.standard_normal((size, horizon, n_assets)) @ factor.T
+            growth = shock * np.exp(np.log1p(np.maximum(daily, -1 + 1e-12)).sum(axis=1))
+            pnl[start:start + size] = (growth - 1) @ self.weights * self.portfolio_value
+
+        cutoff = np.quantile(pnl, 1 - confidence)
+        return {
+            'pnl': pnl,
+            'VaR': -cutoff,
+            'CVaR': -pnl[pnl <= cutoff].mean(),
+            'percentiles': dict(zip((1, 5, 50, 95, 99), np.percentile(pnl, [1, 5, 50, 95, 99]))),
+        }
+
+    def stress_test(self, market_moves=(-0.05, -0.10, -0.20), holding_values=None):
+        """
+        Instant P&L per holding for benchmark moves, scaled by each holding's beta
+
+        Parameters:
+        market_moves: Benchmark moves to evaluate
+        holding_values: Market value per holding (defaults to weights x portfolio_value)
+        """
+        if holding_values is None:
+            holding_values = self.weights * self.portfolio_value
+        impact = np.outer(self.betas()['Beta'].to_numpy() * np.asarray(holding_values), market_moves)
+        return pd.DataFrame(impact, index=self.symbols, columns=[f"{move:+.0%} NIFTY" for move in market_moves])
+
+    def summary(self, confidence=0.95, horizon=1, n_paths=10000, seed=None):
+        """Volatility, beta and VaR/CVaR from all three methods in one dict"""
+        summary = {'Annualized Volatility': self.portfolio_returns().std(ddof=1) * np.sqrt(TRADING_DAYS)}
+        for method, result in (('Parametric', self.parametric_var(confidence, horizon)),
+                               ('Historical', self.historical_var(confidence, horizon)),
+                               ('Monte Carlo', self.monte_carlo(n_paths, horizon, confidence, seed=seed))):
+            summary[f"{method} VaR"] = result['VaR']
+            summary[f"{method} CVaR"] = result['CVaR']
+        if self.benchmark is not None:
+            summary['Portfolio Beta'] = self.portfolio_beta()
+        return summary
@@ -0,0 +1,169 @@
+import sqlite3
+from datetime import date as Date
+from pathlib import Path
+
+import pandas as pd
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    date TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    quantity REAL,
+    avg_cost REAL,
+    ltp REAL,
+    invested REAL,
+    current_value REAL,
+    PRIMARY KEY (date, symbol)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS snapshots_symbol_date ON snapshots (symbol, date);
+CREATE TABLE IF NOT EXISTS daily_totals (
+    date TEXT PRIMARY KEY,
+    invested REAL,
+    current_value REAL,
+    holdings INTEGER
+) WITHOUT ROWID;
+"""
+
+
+def _iso_date(value):
+    return pd.Timestamp(value).date().isoformat() if value is not None else None
+
+
+class HoldingsSnapshotStore:
+    def __init__(self, path='holdings_snapshots.db'):
+        """
+        Append-only store of daily Kite holdings snapshots in SQLite
+
+        Rows are keyed by (date, symbol) in a clustered WITHOUT ROWID table, so
+        one day's snapshot is a contiguous range read; a (symbol, date) index
+        serves per-stock history. Per-day totals are written at ingest time, so
+        portfolio value and P&L over time read one row per day instead of
+        aggregating every holding.
+
+        Parameters:
+        path: SQLite database file (created on first use)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def ingest(self, holdings, date=None, replace=False):
+        """
+        Store one holdings export under a date
+
+        Parameters:
+        holdings: DataFrame in the Kite holdings export format ('Instrument' or
+                  'Symbol', 'Qty.', 'Avg. cost', 'LTP')
+        date: Snapshot date (defaults to today)
+        replace: Overwrite an existing snapshot for that date instead of keeping it
+
+        Returns the number of holdings written (0 if the date was already stored)
+        """
+        date = _iso_date(date or Date.today())
+        symbol_col = 'Symbol' if 'Symbol' in holdings.columns else 'Instrument'
+        quantity = pd.to_numeric(holdings['Qty.'], errors='coerce')
+        avg_cost = pd.to_numeric(holdings['Avg. cost'], errors='coerce')
+        ltp = pd.to_numeric(holdings['LTP'], errors='coerce')
+        rows = pd.DataFrame({
+            'date': date,
+            'symbol': holdings[symbol_col].astype(str).str.strip(),
+            'quantity': quantity,
+            'avg_cost': avg_cost,
+            'ltp': ltp,
+            'invested': quantity * avg_cost,
+            'current_value': quantity * ltp,
+        }).groupby(['date', 'symbol'], as_index=False).agg(
+            quantity=('quantity', 'sum'), invested=('invested', 'sum'),
+            current_value=('current_value', 'sum'), ltp=('ltp', 'last'))
+        # Merge duplicate rows of the same symbol (e.g. pledged + free quantity)
+        rows['avg_cost'] = rows['invested'] / rows['quantity']
+
+        with self.conn:
+            exists = self.conn.execute('SELECT 1 FROM daily_totals WHERE date = ?', (date,)).fetchone()
+            if exists and not replace:
+                print(f"Snapshot for {date} already stored, skipping (use replace=True to overwrite)")
+                return 0
+            self.conn.execute('DELETE FROM snapshots WHERE date = ?', (date,))
+            self.conn.executemany(
+                'INSERT INTO snapshots (date, symbol, quantity, avg_cost, ltp, invested, current_value) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                rows[['date', 'symbol', 'quantity', 'avg_cost', 'ltp', 'invested', 'current_value']]
+                .astype(object).where(rows.notna(), None).itertuples(index=False, name=None),
+            )
+            self.conn.execute(
+                'INSERT OR REPLACE INTO daily_totals (date, invested, current_value, holdings) VALUES (?, ?, ?, ?)',
+                (date, float(rows['invested'].sum()), float(rows['current_value'].sum()), len(rows)),
+            )
+        return len(rows)
+
+    def ingest_csv(self, path, date=None, replace=False):
+        """Ingest a holdings CSV export (date defaults to today)"""
+        return self.ingest(pd.read_csv(path), date, replace)
+
+    def dates(self):
+        return [row[0] for row in self.conn.execute('SELECT date FROM daily_totals ORDER BY date')]
+
+    def _read(self, sql, params):
+        frame = pd.read_sql_query(sql, self.conn, params=params)
+        if 'date' in frame.columns:
+            frame['date'] = pd.to_datetime(frame['date'])
+        return frame
+
+    def _range(self, start, end):
+        return _iso_date(start) or '0000-00-00', _iso_date(end) or '9999-99-99'
+
+    def snapshot(self, date):
+        """All holdings stored for one date"""
+        return self._read(
+            'SELECT symbol, quantity, avg_cost, ltp, invested, current_value '
+            'FROM snapshots WHERE date = ? ORDER BY symbol', (_iso_date(date),))
+
+    def value_history(self, start=None, end=None):
+        """Portfolio invested value, market value and unrealised P&L per snapshot date"""
+        history = self._read(
+            'SELECT date, invested, current_value, holdings FROM daily_totals '
+            'WHERE date BETWEEN ? AND ? ORDER BY date', self._range(start, end)).set_index('date')
+        history['pnl'] = history['current_value'] - history['invested']
+        history['pnl_pct'] = history['pnl'] / history['invested'] * 100
+        return history
+
+    def symbol_history(self, symbol, start=None, end=None):
+        """Quantity, price, value and P&L of one stock across snapshots"""
+        history = self._read(
+            'SELECT date, quantity, avg_cost, ltp, invested, current_value FROM snapshots '
+            'WHERE symbol = ? AND date BETWEEN ? AND ? ORDER BY date',
+            (symbol, *self._range(start, end))).set_index('date')
+        history['pnl'] = history['current_value'] - history['invested']
+        return history
+
+    def allocation_history(self, start=None, end=None, symbols=None):
+        """
+        Allocation % of each stock per snapshot date (dates x symbols, 0 when not held)
+
+        Parameters:
+        start, end: Optional date range
+        symbols: Optional subset of symbols to return
+        """
+        params = list(self._range(start, end))
+        sql = ('SELECT s.date, s.symbol, s.current_value * 100.0 / t.current_value AS allocation '
+               'FROM snapshots s JOIN daily_totals t ON t.date = s.date '
+               'WHERE s.date BETWEEN ? AND ?')
+        if symbols is not None:
+            symbols = list(symbols)
+            sql += f" AND s.symbol IN ({', '.join('?' * len(symbols))})"
+            params += symbols
+        frame = self._read(sql, params)
+        return frame.pivot(index='date', columns='symbol', values='allocation').fillna(0.0)
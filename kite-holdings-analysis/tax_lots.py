@@ -0,0 +1,216 @@
+import numpy as np
+import pandas as pd
+
+LONG_TERM_DAYS = 365
+STCG_RATE = 0.20
+LTCG_RATE = 0.125
+LTCG_EXEMPTION = 125000
+
+
+def load_tradebook(paths):
+    """
+    Read one or more Kite Console tradebook CSV exports into one normalized frame
+
+    Parameters:
+    paths: CSV path or list of paths (Console exports one file per financial year)
+
+    Returns a DataFrame with symbol, time, side (1 buy / -1 sell), quantity and
+    price, sorted by symbol and execution time, duplicate trade ids removed
+    """
+    if isinstance(paths, (str, bytes)) or not hasattr(paths, '__iter__'):
+        paths = [paths]
+    raw = pd.concat([pd.read_csv(path) for path in paths], ignore_index=True)
+    if 'trade_id' in raw.columns:
+        raw = raw.drop_duplicates(['trade_id', 'order_id'] if 'order_id' in raw.columns else ['trade_id'])
+
+    time_col = 'order_execution_time' if 'order_execution_time' in raw.columns else 'trade_date'
+    time = pd.to_datetime(raw[time_col])
+    trades = pd.DataFrame({
+        'symbol': raw['symbol'].astype(str).str.strip(),
+        'time': time.dt.tz_localize(None) if time.dt.tz is not None else time,
+        'side': np.where(raw['trade_type'].str.lower().str.strip() == 'buy', 1, -1).astype(np.int8),
+        'quantity': pd.to_numeric(raw['quantity'], errors='coerce').astype(np.float64),
+        'price': pd.to_numeric(raw['price'], errors='coerce').astype(np.float64),
+    })
+    return trades.sort_values(['symbol', 'time', 'side'], ascending=[True, True, False],
+                              kind='stable', ignore_index=True)
+
+
+def _cumulative_bounds(codes, quantity, offsets):
+    """Start/end of each trade on a global cumulative-quantity axis, per-symbol offset added"""
+    total = np.cumsum(quantity)
+    group_start = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else np.array([], int)
+    before_group = np.repeat(total[group_start] - quantity[group_start], np.diff(np.r_[group_start, len(codes)]))
+    end = offsets[codes] + total - before_group
+    return end - quantity, end
+
+
+def fifo_lots(trades, as_of=None):
+    """
+    Match sells to buys first-in-first-out for every symbol at once
+
+    Each symbol's buys and sells are laid out on one cumulative quantity axis
+    (symbols separated by per-symbol offsets). Every sell interval overlapping
+    a buy interval is a realised lot; what is left of the buys are the open
+    lots. All matching is done with cumsum and searchsorted over the merged
+    breakpoints, so the cost is O(n log n) with no per-trade Python loop.
+
+    Parameters:
+    trades: Output of load_tradebook
+    as_of: Date the open lots' holding periods are measured to (default today)
+
+    Returns a dict with 'realised', 'open' and 'unmatched' (sells exceeding the
+    shares bought so far, e.g. bought before the first export) DataFrames.
+    Cost basis ignores charges, splits/bonuses and the 31 Jan 2018 grandfathering.
+    """
+    as_of = pd.Timestamp(as_of or pd.Timestamp.today()).normalize()
+    symbols, codes = np.unique(trades['symbol'].to_numpy(dtype=str), return_inverse=True)
+    side = trades['side'].to_numpy()
+    quantity = trades['quantity'].to_numpy(dtype=np.float64)
+    buy, sell = side > 0, side < 0
+
+    # Sold quantity exceeding the running inventory has no buy to match (bought
+    # before the tradebook starts); take it out so later buys stay open
+    inventory = pd.Series(side * quantity).groupby(codes).cumsum()
+    deficit = -np.minimum(inventory.groupby(codes).cummin().to_numpy(), 0.0)
+    shortfall = deficit - np.r_[0.0, deficit[:-1]] * np.r_[False, codes[1:] == codes[:-1]]
+    quantity = quantity - shortfall
+
+    # One axis per symbol, wide enough for whichever of its buys or sells is larger
+    span = np.maximum(np.bincount(codes[buy], quantity[buy], len(symbols)),
+                      np.bincount(codes[sell], quantity[sell], len(symbols)))
+    offsets = np.r_[0.0, np.cumsum(span)[:-1]]
+    buy_rows, sell_rows = np.flatnonzero(buy), np.flatnonzero(sell)
+    buy_start, buy_end = _cumulative_bounds(codes[buy], quantity[buy], offsets)
+    sell_start, sell_end = _cumulative_bounds(codes[sell], quantity[sell], offsets)
+
+    points = np.unique(np.concatenate([buy_start, buy_end, sell_start, sell_end]))
+    lengths = np.diff(points)
+    mids = points[:-1] + lengths / 2
+    keep = lengths > 1e-9
+    mids, lengths = mids[keep], lengths[keep]
+
+    b = np.searchsorted(buy_end, mids, side='right')
+    s = np.searchsorted(sell_end, mids, side='right')
+    in_buy = b < len(buy_end)
+    in_buy[in_buy] = buy_start[b[in_buy]] <= mids[in_buy]
+    in_sell = s < len(sell_end)
+    in_sell[in_sell] = sell_start[s[in_sell]] <= mids[in_sell]
+
+    time = trades['time'].to_numpy()
+    price = trades['price'].to_numpy(dtype=np.float64)
+
+    matched = in_buy & in_sell
+    buy_idx, sell_idx = buy_rows[b[matched]], sell_rows[s[matched]]
+    realised = pd.DataFrame({
+        'symbol': symbols[codes[buy_idx]],
+        'quantity': lengths[matched],
+        'buy_date': time[buy_idx],
+        'buy_price': price[buy_idx],
+        'sell_date': time[sell_idx],
+        'sell_price': price[sell_idx],
+    })
+    realised['holding_days'] = (realised['sell_date'].dt.normalize() - realised['buy_date'].dt.normalize()).dt.days
+    realised['term'] = np.where(realised['holding_days'] > LONG_TERM_DAYS, 'LTCG', 'STCG')
+    realised['gain'] = realised['quantity'] * (realised['sell_price'] - realised['buy_price'])
+    realised['financial_year'] = _financial_year(realised['sell_date'])
+
+    # Unsold parts of a buy are contiguous on the axis: sum them per buy trade
+    open_pieces = in_buy & ~in_sell
+    open_buys, open_quantity = np.unique(buy_rows[b[open_pieces]], return_inverse=True)
+    open_lots = pd.DataFrame({
+        'symbol': symbols[codes[open_buys]],
+        'quantity': np.bincount(open_quantity, lengths[open_pieces], len(open_buys)),
+        'buy_date': time[open_buys],
+        'buy_price': price[open_buys],
+    })
+    open_lots['holding_days'] = (as_of - open_lots['buy_date'].dt.normalize()).dt.days
+    open_lots['term'] = np.where(open_lots['holding_days'] > LONG_TERM_DAYS, 'LTCG', 'STCG')
+    open_lots['days_to_long_term'] = np.maximum(LONG_TERM_DAYS + 1 - open_lots['holding_days'], 0)
+
+    short = shortfall > 0
+    unmatched = pd.DataFrame({'symbol': symbols[codes[short]], 'quantity': shortfall[short],
+                              'sell_date': time[short], 'sell_price': price[short]})
+    return {'realised': realised, 'open': open_lots, 'unmatched': unmatched}
+
+
+def _financial_year(dates):
+    """Indian financial year label (April to March), e.g. 'FY2024-25'"""
+    start = dates.dt.year - (dates.dt.month < 4)
+    return 'FY' + start.astype(str) + '-' + ((start + 1) % 100).astype(str).str.zfill(2)
+
+
+def unrealised_gains(open_lots, prices):
+    """
+    Mark open lots to market
+
+    Parameters:
+    open_lots: fifo_lots(...)['open']
+    prices: Mapping or Series of symbol -> last price (e.g. the holdings LTP)
+    """
+    lots = open_lots.copy()
+    lots['ltp'] = lots['symbol'].map(prices).astype(np.float64)
+    lots['unrealised_gain'] = lots['quantity'] * (lots['ltp'] - lots['buy_price'])
+    return lots
+
+
+def capital_gains_summary(realised, stcg_rate=STCG_RATE, ltcg_rate=LTCG_RATE, ltcg_exemption=LTCG_EXEMPTION):
+    """
+    Realised STCG/LTCG per financial year with an estimated tax
+
+    Losses are set off the way the Act allows: short-term losses against
+    short-term then long-term gains, long-term losses only against long-term
+    gains; the LTCG exemption applies to what remains. Uses the current
+    rates for every year (surcharge and cess excluded).
+    """
+    table = realised.pivot_table(index='financial_year', columns='term', values='gain',
+                                 aggfunc='sum', fill_value=0.0)
+    table = table.reindex(columns=['STCG', 'LTCG'], fill_value=0.0)
+    stcg, ltcg = table['STCG'].to_numpy(), table['LTCG'].to_numpy()
+    st_loss_left = np.maximum(-stcg, 0.0)
+    taxable_st = np.maximum(stcg, 0.0)
+    taxable_lt = np.where(ltcg > 0, np.maximum(ltcg - st_loss_left, 0.0), 0.0)
+    summary = pd.DataFrame({
+        'STCG': stcg,
+        'LTCG': ltcg,
+        'Taxable STCG': taxable_st,
+        'Taxable LTCG': np.maximum(taxable_lt - ltcg_exemption, 0.0),
+    }, index=table.index)
+    summary['Estimated Tax'] = summary['Taxable STCG'] * stcg_rate + summary['Taxable LTCG'] * ltcg_rate
+    return summary
+
+
+def harvest_candidates(lots, realised_summary=None, financial_year=None, ltcg_exemption=LTCG_EXEMPTION,
+                       wait_days=30):
+    """
+    Open lots worth acting on before the financial year ends
+
+    - Loss harvesting: lots with an unrealised loss that could offset gains
+    - Gain harvesting: long-term lots with gains that fit in the unused LTCG exemption
+    - Wait: short-term lots in profit that turn long-term within `wait_days`
+
+    Parameters:
+    lots: unrealised_gains(...) output
+    realised_summary: capital_gains_summary(...) output, used for the unused exemption
+    financial_year: Row of realised_summary to use (defaults to the latest)
+    """
+    lots = lots.dropna(subset=['unrealised_gain'])
+    used_exemption = 0.0
+    if realised_summary is not None and len(realised_summary):
+        row = realised_summary.loc[financial_year] if financial_year else realised_summary.iloc[-1]
+        used_exemption = max(row['LTCG'] - max(-row['STCG'], 0.0), 0.0)
+    exemption_left = max(ltcg_exemption - used_exemption, 0.0)
+
+    losses = lots[lots['unrealised_gain'] < 0].assign(action='Harvest loss')
+
+    long_term_gains = lots[(lots['term'] == 'LTCG') & (lots['unrealised_gain'] > 0)]
+    long_term_gains = long_term_gains.sort_values('unrealised_gain')
+    fits = long_term_gains['unrealised_gain'].cumsum() <= exemption_left
+    gains = long_term_gains[fits].assign(action='Book LTCG within exemption')
+
+    waits = lots[(lots['term'] == 'STCG') & (lots['unrealised_gain'] > 0)
+                 & (lots['days_to_long_term'] <= wait_days)].assign(action='Wait for long-term')
+
+    candidates = pd.concat([losses, gains, waits], ignore_index=True)
+    candidates.attrs['ltcg_exemption_left'] = exemption_left
+    return candidates.sort_values(['action', 'unrealised_gain'], ignore_index=True)
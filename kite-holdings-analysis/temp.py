@@ -1,8 +1,14 @@
 #%%
+from glob import glob
+
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
-from nsepython import *
+from nse_quotes import NSEQuoteClient
+from optimizer import target_weights, trade_list
+from risk import PortfolioRisk, format_summary, load_returns
+from snapshot_store import HoldingsSnapshotStore
+from tax_lots import capital_gains_summary, fifo_lots, harvest_candidates, load_tradebook, unrealised_gains
 #%%
 # Load holdings data
 file_path = 'holdings.csv'  # replace with your file path
@@ -55,66 +61,110 @@ print(f"Current Market Value: ₹{total_current_value:,.2f}")
 print(f"Total Unrealised P&L: ₹{total_unrealised_pl:,.2f} ({total_return_percent:.2f}%)")
 
 # 5. Time-Based Performance Tracking
-# For demo, simulate with current data
-# Maintain daily snapshots in a database or CSV to plot over time.
-
-print("\nFor time-based tracking, store daily snapshots to build a performance graph.")
-
-# 6. Dividend Yield Analysis using nsepython
-dividend_yields = []
-for symbol in df['Symbol']:
-    try:
-        quote = nse_quote(symbol)
-        div_yield = float(quote['data'][0].get('divYield', '0').replace('%',''))
-        dividend_yields.append(div_yield)
-    except Exception as e:
-        dividend_yields.append(np.nan)
+# Append today's export to the snapshot store (one snapshot per date) and plot the history
+snapshots = HoldingsSnapshotStore('holdings_snapshots.db')
+snapshots.ingest(df)
+value_history = snapshots.value_history()
+first, last = value_history.index.min(), value_history.index.max()
+print(f"\nSnapshots stored: {len(value_history)} ({first:%Y-%m-%d} to {last:%Y-%m-%d})")
+
+if len(value_history) > 1:
+    fig, (ax_value, ax_pnl) = plt.subplots(2, 1, figsize=(10, 7), sharex=True)
+    value_history[['invested', 'current_value']].plot(ax=ax_value, title='Portfolio Value Over Time')
+    value_history['pnl'].plot(ax=ax_pnl, title='Unrealised P&L Over Time', color='green')
+    plt.tight_layout()
+    plt.show()
+
+# 6. Risk Exposure Analysis - Beta regressed on 3 years of daily returns against NIFTY 50
+try:
+    returns, nifty_returns = load_returns(df['Symbol'], pd.Timestamp.today() - pd.DateOffset(years=3), None)
+    weights = df.groupby('Symbol')['Current Value'].sum()
+    risk = PortfolioRisk(returns, weights, nifty_returns, portfolio_value=total_current_value)
+    df['Beta'] = df['Symbol'].map(risk.betas()['Beta'])
+except Exception as e:
+    print(f"\nCould not load price history for beta ({e})")
+    risk = None
+    df['Beta'] = np.nan
+
+no_beta = df.loc[df['Beta'].isna(), 'Symbol']
+if len(no_beta):
+    print(f"No price history for beta (left out of the portfolio beta): {', '.join(no_beta)}")
 
-df['Dividend Yield %'] = dividend_yields
-df['Estimated Annual Dividend'] = (df['Current Value'] * df['Dividend Yield %']) / 100
-print("\nDividend Yield Analysis:")
-print(df[['Symbol', 'Dividend Yield %', 'Estimated Annual Dividend']])
-
-# 7. Risk Exposure Analysis - Beta from NSEPython
-betas = []
-for symbol in df['Symbol']:
-    try:
-        quote = nse_quote(symbol)
-        beta = float(quote['data'][0].get('beta', '0'))
-        betas.append(beta)
-    except Exception as e:
-        betas.append(np.nan)
-
-df['Beta'] = betas
 df['Weighted Beta'] = df['Beta'] * (df['Portfolio Allocation %'] / 100)
 portfolio_beta = df['Weighted Beta'].sum()
 print(f"\nPortfolio Beta (Market risk exposure): {portfolio_beta:.2f}")
 
-# 8. Rebalancing & Optimization Analysis
+# 7. Rebalancing & Optimization Analysis
 # Example: equal weight strategy suggestion
 equal_weight = 100 / num_stocks
 df['Rebalance Diff %'] = df['Portfolio Allocation %'] - equal_weight
 print("\nRebalancing Suggestions (Positive=overweight, Negative=underweight):")
 print(df[['Symbol', 'Portfolio Allocation %', 'Rebalance Diff %']])
 
-# 9. Scenario & Sensitivity Analysis
-# Example: impact of 5% market correction
-df['-5% Correction Impact'] = df['Current Value'] * -0.05
+# Optimized targets from the return history loaded for the risk analysis
+if risk is not None:
+    targets = pd.DataFrame({method: target_weights(returns, method, max_weight=max(0.15, 1 / returns.shape[1])) * 100
+                            for method in ('min_variance', 'risk_parity', 'max_sharpe')})
+    print("\nOptimized Target Allocation %:")
+    print(targets.round(2))
+
+    method = 'risk_parity'
+    holdings = df.groupby('Symbol').agg(quantity=('Qty.', 'sum'), price=('LTP', 'last'))
+    orders = trade_list(holdings['quantity'], holdings['price'], targets[method] / 100,
+                        no_trade_band=0.01, max_turnover=0.20)
+    print(f"\nTrades to move towards {method} (1% no-trade band, 20% turnover cap):")
+    print(orders[['Symbol', 'Action', 'Trade Qty', 'Price', 'Trade Value', 'Current %', 'Target %', 'Est. Charges']])
+    print(f"Estimated charges: ₹{orders['Est. Charges'].sum():,.2f}")
+
+# 8. Scenario & Sensitivity Analysis
+# Impact of a 5% NIFTY correction, scaled by each stock's beta
+df['-5% Correction Impact'] = df['Current Value'] * df['Beta'].fillna(1.0) * -0.05
 portfolio_impact = df['-5% Correction Impact'].sum()
-print(f"\nEstimated Portfolio Loss in -5% Correction: ₹{portfolio_impact:,.2f}")
-
-# 10. Tax Optimization Analysis
-# Assuming you track holding period, calculate LTCG vs STCG eligibility
+print(f"\nEstimated Portfolio Loss in -5% NIFTY Correction: ₹{portfolio_impact:,.2f}")
+
+if risk is not None:
+    print("\nValue at Risk (95%, 1 day):")
+    for name, value in format_summary(risk.summary(confidence=0.95, horizon=1, seed=0)).items():
+        print(f"{name}: {value}")
+
+    crash = risk.monte_carlo(n_paths=10000, horizon=21, vol_multiplier=2.0, market_shock=-0.10, seed=0)
+    print(f"Stress (NIFTY -10% then 2x volatility for a month): VaR ₹{crash['VaR']:,.2f}, CVaR ₹{crash['CVaR']:,.2f}")
+
+# 9. Tax Optimization Analysis
+# FIFO tax lots from the Kite Console tradebook exports (tradebook*.csv, one per financial year)
+tradebook_files = sorted(glob('tradebook*.csv'))
+if tradebook_files:
+    lots = fifo_lots(load_tradebook(tradebook_files))
+    gains_summary = capital_gains_summary(lots['realised'])
+    print("\nRealised Capital Gains by Financial Year:")
+    print(gains_summary)
+
+    open_lots = unrealised_gains(lots['open'], df.groupby('Symbol')['LTP'].last())
+    unrealised_by_term = open_lots.groupby('term')['unrealised_gain'].sum()
+    print("\nUnrealised Gains by Term:")
+    print(unrealised_by_term)
+
+    candidates = harvest_candidates(open_lots, gains_summary)
+    print(f"\nTax Harvest Candidates (LTCG exemption left: ₹{candidates.attrs['ltcg_exemption_left']:,.2f}):")
+    print(candidates[['symbol', 'action', 'quantity', 'buy_date', 'buy_price', 'ltp',
+                      'unrealised_gain', 'days_to_long_term']])
+    if len(lots['unmatched']):
+        print("\nSells without a matching buy in the tradebook (export older years to include them):")
+        print(lots['unmatched'].groupby('symbol')['quantity'].sum())
+else:
+    print("\nNo tradebook*.csv found; export the tradebook from Kite Console for LTCG/STCG analysis.")
 
 # BONUS: NSE Integration for Sector and Market Cap
+# Fetch every NSE quote once (pooled, rate limited, cached for 15 minutes)
+quotes = NSEQuoteClient(cache_path='.cache/nse_quotes.json').quotes(df['Symbol'])
 sectors = []
 market_caps = []
 
 for symbol in df['Symbol']:
     try:
-        quote = nse_quote(symbol)
-        sector = quote['metadata']['sector']
-        mcap = quote['metadata']['marketCap']
+        quote = quotes[symbol]
+        sector = quote['industryInfo']['sector']
+        mcap = quote['securityInfo']['issuedSize'] * quote['priceInfo']['lastPrice']
         sectors.append(sector)
         market_caps.append(mcap)
     except Exception as e:
@@ -1,6 +1,242 @@
-def main():
-    print("Hello from py-lab!")
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+BACKTESTING_DIR = ROOT / 'backtesting'
+HOLDINGS_DIR = ROOT / 'kite-holdings-analysis'
+
+STRATEGIES = ('sma', 'ema', 'rsi', 'macd', 'bollinger')
+
+
+def _use(directory):
+    """Make a project folder's modules importable (they import each other by bare name)"""
+    if not directory.is_dir():
+        # Only main.py is installed; the project folders are read from the source tree
+        sys.exit(f"py-lab: {directory} not found. The CLI runs from a source checkout; "
+                 f"install it with 'pip install -e .' (or 'uv sync') from the repository root.")
+    if str(directory) not in sys.path:
+        sys.path.insert(0, str(directory))
+
+
+def _backtester(args):
+    _use(BACKTESTING_DIR)
+    from data_cache import OHLCVCache
+    from instrumentation import Profiler
+    from main_claude import Backtester
+
+    results = None
+    if args.result_cache:
+        from result_cache import ResultCache
+        results = ResultCache()
+    bt = Backtester(args.symbol, args.start, args.end, args.capital,
+                    cache=None if args.no_cache else OHLCVCache(),
+                    profiler=Profiler() if args.profile else None, interval=args.interval,
+                    results=results)
+    return bt if bt.fetch_data() else None
+
+
+def _strategy(args):
+    import strategies
+
+    if args.strategy == 'sma':
+        return strategies.SMACrossover(args.short, args.long)
+    if args.strategy == 'ema':
+        return strategies.EMACrossover(args.short, args.long)
+    if args.strategy == 'rsi':
+        return strategies.RSIReversion()
+    if args.strategy == 'macd':
+        return strategies.MACDCrossover()
+    return strategies.BollingerReversion()
+
+
+def backtest(args):
+    bt = _backtester(args)
+    if bt is None:
+        return 1
+
+    result = bt.backtest(_strategy(args), args.execute, args.stop_loss, args.take_profit)
+
+    from metrics import format_metrics
+    for key, value in format_metrics(result['metrics']).items():
+        print(f"{key}: {value}")
+
+    if args.plot and result['cached']:
+        print("Report skipped: result served from the result cache (rerun without --result-cache to plot)")
+    elif args.plot:
+        print(f"Report saved to {bt.plot_results(save_path=args.plot)}")
+    if bt.results is not None:
+        print(f"Result cache: {bt.results.stats()}")
+    if args.profile:
+        bt.profiler.print_summary()
+    return 0
+
+
+def sweep(args):
+    bt = _backtester(args)
+    if bt is None:
+        return 1
+
+    if args.walk_forward:
+        result = bt.walk_forward(args.short, args.long, args.train, args.test, processes=args.processes)
+        if result is None:
+            return 1
+        from metrics import format_metrics
+        print(result['folds'].to_string())
+        for key, value in format_metrics(result['metrics']).items():
+            print(f"{key}: {value}")
+    else:
+        results = bt.moving_average_sweep(args.short, args.long)
+        if results is None:
+            return 1
+        print(results.head(args.top).to_string())
+    if bt.results is not None:
+        print(f"Result cache: {bt.results.stats()}")
+    if args.profile:
+        bt.profiler.print_summary()
+    return 0
+
+
+def holdings(args):
+    _use(HOLDINGS_DIR)
+    import pandas as pd
+
+    df = pd.read_csv(args.csv)
+    for col in ('Qty.', 'Avg. cost', 'LTP'):
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    symbol_col = 'Symbol' if 'Symbol' in df.columns else 'Instrument'
+    df['Symbol'] = df[symbol_col]
+    df['Invested Value'] = df['Qty.'] * df['Avg. cost']
+    df['Current Value'] = df['Qty.'] * df['LTP']
+    df['Unrealised P&L'] = df['Current Value'] - df['Invested Value']
+    df['Allocation %'] = df['Current Value'] / df['Current Value'].sum() * 100
+
+    invested, current = df['Invested Value'].sum(), df['Current Value'].sum()
+    print(df.sort_values('Allocation %', ascending=False)[
+        ['Symbol', 'Qty.', 'LTP', 'Current Value', 'Unrealised P&L', 'Allocation %']].to_string(index=False))
+    print(f"\nInvested: ₹{invested:,.2f}  Current: ₹{current:,.2f}  "
+          f"P&L: ₹{current - invested:,.2f} ({(current - invested) / invested:.2%})")
+
+    if args.snapshot_db:
+        from snapshot_store import HoldingsSnapshotStore
+        with HoldingsSnapshotStore(args.snapshot_db) as store:
+            store.ingest(df, args.date)
+            print(f"\nSnapshots stored: {len(store.dates())}")
+
+    if args.risk or args.optimize:
+        from risk import PortfolioRisk, format_summary, load_returns
+        returns, nifty = load_returns(df['Symbol'], pd.Timestamp.today() - pd.DateOffset(years=args.years), None)
+        weights = df.groupby('Symbol')['Current Value'].sum()
+        risk = PortfolioRisk(returns, weights, nifty, portfolio_value=current)
+        if args.risk:
+            print("\nRisk (95%, 1 day):")
+            for key, value in format_summary(risk.summary(seed=0)).items():
+                print(f"{key}: {value}")
+        if args.optimize:
+            from optimizer import target_weights, trade_list
+            targets = target_weights(returns, args.optimize, max_weight=max(args.max_weight, 1 / returns.shape[1]))
+            positions = df.groupby('Symbol').agg(quantity=('Qty.', 'sum'), price=('LTP', 'last'))
+            orders = trade_list(positions['quantity'], positions['price'], targets,
+                                no_trade_band=args.band, max_turnover=args.max_turnover)
+            print(f"\nTrades towards {args.optimize}:")
+            print(orders[['Symbol', 'Action', 'Trade Qty', 'Price', 'Trade Value', 'Target %', 'Est. Charges']]
+                  .to_string(index=False))
+    return 0
+
+
+def scan(args):
+    _use(BACKTESTING_DIR)
+    from data_cache import OHLCVCache
+    from scanner import UniverseScanner
+
+    cache = OHLCVCache()
+    if Path(args.state).exists():
+        scanner = UniverseScanner.load(args.state)
+        events = scanner.update(cache, args.end)
+    else:
+        if not args.symbols:
+            print("No scanner state yet: pass the universe symbols to build it.")
+            return 1
+        scanner = UniverseScanner.from_universe(args.symbols, args.start, args.end, args.short, args.long,
+                                                args.move, cache)
+        scanner.save(args.state)
+        print(f"Scanner built for {len(scanner.symbols)} symbols up to {scanner.last_date.date()}")
+        return 0
+
+    print(events.to_string(index=False) if len(events) else "No new events.")
+    scanner.save(args.state)
+    return 0
+
+
+def _add_data_arguments(parser):
+    parser.add_argument('symbol', help='Ticker, e.g. AAPL or TCS.NS')
+    parser.add_argument('--start', default='2020-01-01')
+    parser.add_argument('--end', default=None)
+    parser.add_argument('--interval', default='1d', help="Bar interval ('1d', '1h', '15m', ...)")
+    parser.add_argument('--capital', type=float, default=10000)
+    parser.add_argument('--no-cache', action='store_true', help='Always download instead of using the OHLCV cache')
+    parser.add_argument('--profile', action='store_true', help='Print per-stage timings and memory')
+    parser.add_argument('--result-cache', action='store_true',
+                        help='Reuse results of identical earlier runs (same data, parameters and code)')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='py-lab', description='Backtesting and holdings analysis tools')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    p = commands.add_parser('backtest', help='Backtest one strategy on one symbol')
+    _add_data_arguments(p)
+    p.add_argument('--strategy', choices=STRATEGIES, default='sma')
+    p.add_argument('--short', type=int, default=20, help='Short window / fast span')
+    p.add_argument('--long', type=int, default=50, help='Long window / slow span')
+    p.add_argument('--execute', action='store_true', help='Next-open fills with charges and slippage')
+    p.add_argument('--stop-loss', type=float, help='Protective stop, e.g. 0.05 (implies --execute)')
+    p.add_argument('--take-profit', type=float, help='Profit target, e.g. 0.10 (implies --execute)')
+    p.add_argument('--plot', metavar='PATH', help='Save the report chart (PNG/SVG) instead of showing it')
+    p.set_defaults(func=backtest)
+
+    p = commands.add_parser('sweep', help='Sweep SMA crossover windows on one symbol')
+    _add_data_arguments(p)
+    p.add_argument('--short', type=int, nargs='+', default=list(range(5, 60, 5)))
+    p.add_argument('--long', type=int, nargs='+', default=list(range(20, 250, 10)))
+    p.add_argument('--top', type=int, default=10, help='Window pairs to print')
+    p.add_argument('--walk-forward', action='store_true', help='Walk-forward optimization instead of in-sample')
+    p.add_argument('--train', type=int, default=756, help='Walk-forward training bars')
+    p.add_argument('--test', type=int, default=252, help='Walk-forward out-of-sample bars')
+    p.add_argument('--processes', type=int, help='Worker processes for walk-forward folds')
+    p.set_defaults(func=sweep)
+
+    p = commands.add_parser('scan', help='Report new crossover/threshold events across a universe')
+    p.add_argument('symbols', nargs='*', help='Universe symbols (only needed to build the state)')
+    p.add_argument('--state', default='scanner_state.npz', help='Scanner state file')
+    p.add_argument('--start', default='2022-01-01', help='History start when building the state')
+    p.add_argument('--end', default=None)
+    p.add_argument('--short', type=int, default=50)
+    p.add_argument('--long', type=int, default=200)
+    p.add_argument('--move', type=float, default=0.05, help="Daily return reported as 'Big Move'")
+    p.set_defaults(func=scan)
+
+    p = commands.add_parser('holdings', help='Analyse a Kite holdings export')
+    p.add_argument('csv', help='Kite holdings CSV export')
+    p.add_argument('--snapshot-db', metavar='PATH', help='Append this export to a snapshot database')
+    p.add_argument('--date', help='Snapshot date (default today)')
+    p.add_argument('--risk', action='store_true', help='Beta, VaR/CVaR from cached price history')
+    p.add_argument('--optimize', choices=('min_variance', 'risk_parity', 'max_sharpe'),
+                   help='Print a rebalancing trade list towards optimized weights')
+    p.add_argument('--years', type=int, default=3, help='Years of price history for risk/optimization')
+    p.add_argument('--max-weight', type=float, default=0.15)
+    p.add_argument('--band', type=float, default=0.01, help='No-trade band in weight')
+    p.add_argument('--max-turnover', type=float, default=0.20)
+    p.set_defaults(func=holdings)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if getattr(args, 'stop_loss', None) or getattr(args, 'take_profit', None):
+        args.execute = True
+    return args.func(args)
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())